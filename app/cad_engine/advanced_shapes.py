@@ -1,6 +1,19 @@
 """Advanced CAD shapes: Chair and Room with architectural symbols."""
 import math
-from app.cad_engine.base import CADObject
+import numpy as np
+from app.cad_engine.base import CADObject, _FRONT, _SIDE, _TOP
+
+# Top-view variants for door erasing and the chair backrest line
+_TOP_BG = {"layer": "TOP_VIEW", "color": 0}
+_TOP_W2 = {"layer": "TOP_VIEW", "const_width": 2}
+
+# Wall ids used in the RoomShape opening tables (-1 = unknown wall)
+WALL_SOUTH, WALL_NORTH, WALL_WEST, WALL_EAST = range(4)
+_WALLS = ("south", "north", "west", "east")
+_WALL_IDS = {name: i for i, name in enumerate(_WALLS)}
+
+# Window symbol: three parallel lines across a 3cm wall
+_WINDOW_OFFSETS = (-3, 0, 3)
 
 
 class ChairShape(CADObject):
@@ -10,20 +23,25 @@ class ChairShape(CADObject):
     Front view: backrest + seat plate + 4 legs
     """
 
+    def __init__(self, params: dict):
+        super().__init__(params)
+        # Resolve dimensions once; every view reads the attributes
+        self.width = params.get("width", 40)
+        self.length = params.get("length", 40)
+        self.height = params.get("height", 45)
+        self.legs = params.get("legs", 4)
+
     def draw_top_view(self):
-        width = self.params.get("width", 40)
-        length = self.params.get("length", 40)
-        legs = self.params.get("legs", 4)
+        width = self.width
+        length = self.length
+        legs = self.legs
         leg_radius = 2  # visual radius for leg dots
 
         # Title
         self.add_title("TAMPAK ATAS", (0, length + 20))
 
         # Seat (rectangle)
-        seat_points = [
-            (0, 0), (width, 0), (width, length), (0, length)
-        ]
-        self.msp.add_lwpolyline(seat_points, close=True, dxfattribs={"layer": "TOP_VIEW"})
+        self._add_rect(0, 0, width, length, _TOP)
 
         # Leg positions (corners, inset by margin)
         margin = 3
@@ -43,12 +61,12 @@ class ChairShape(CADObject):
             ]
 
         for pos in leg_positions[:legs]:
-            self.msp.add_circle(pos, leg_radius, dxfattribs={"layer": "TOP_VIEW"})
+            self.msp.add_circle(pos, leg_radius, dxfattribs=_TOP)
 
         # Backrest indicator (thick line at the back)
         self.msp.add_lwpolyline(
             [(0, length), (width, length)],
-            dxfattribs={"layer": "TOP_VIEW", "const_width": 2}
+            dxfattribs=_TOP_W2
         )
 
         # Dimensions
@@ -56,8 +74,8 @@ class ChairShape(CADObject):
         self.add_dimension_line((width, 0), (width, length), offset=-15)
 
     def draw_front_view(self):
-        width = self.params.get("width", 40)
-        height = self.params.get("height", 45)
+        width = self.width
+        height = self.height
         seat_thickness = 3
         backrest_height = 20
         leg_width = 3
@@ -68,37 +86,24 @@ class ChairShape(CADObject):
         self.add_title("TAMPAK DEPAN", (0, offset_y + total_h + 15))
 
         seat_top = offset_y + height
-        backrest_top = seat_top + backrest_height
-
-        # Backrest
-        self.msp.add_lwpolyline([
-            (0, seat_top), (width, seat_top),
-            (width, backrest_top), (0, backrest_top)
-        ], close=True, dxfattribs={"layer": "FRONT_VIEW"})
-
-        # Seat plate
-        self.msp.add_lwpolyline([
-            (0, seat_top - seat_thickness), (width, seat_top - seat_thickness),
-            (width, seat_top), (0, seat_top)
-        ], close=True, dxfattribs={"layer": "FRONT_VIEW"})
-
-        # Left front leg
-        lx = leg_width
-        self.msp.add_lwpolyline([
-            (lx, offset_y), (lx + leg_width, offset_y),
-            (lx + leg_width, seat_top - seat_thickness), (lx, seat_top - seat_thickness)
-        ], close=True, dxfattribs={"layer": "FRONT_VIEW"})
-
-        # Right front leg
-        rx = width - leg_width * 2
-        self.msp.add_lwpolyline([
-            (rx, offset_y), (rx + leg_width, offset_y),
-            (rx + leg_width, seat_top - seat_thickness), (rx, seat_top - seat_thickness)
-        ], close=True, dxfattribs={"layer": "FRONT_VIEW"})
+
+        # Collect all outlines and add them in one batch
+        rect = self._rect_points
+        bottom = seat_top - seat_thickness
+        leg_h = bottom - offset_y
+        rects = [
+            rect(0, seat_top, width, backrest_height),              # Backrest
+            rect(0, bottom, width, seat_thickness),                 # Seat plate
+            rect(leg_width, offset_y, leg_width, leg_h),            # Left front leg
+            rect(width - leg_width * 2, offset_y, leg_width, leg_h),  # Right front leg
+        ]
+        self._batch_add_lwpolylines(
+            [(pts, True, "FRONT_VIEW", 0) for pts in rects]
+        )
 
     def draw_side_view(self):
-        length = self.params.get("length", 40)
-        height = self.params.get("height", 45)
+        length = self.length
+        height = self.height
         seat_thickness = 3
         backrest_height = 20
         leg_width = 3
@@ -110,40 +115,24 @@ class ChairShape(CADObject):
         self.add_title("TAMPAK SAMPING", (offset_x, offset_y + total_h + 15))
 
         seat_top = offset_y + height
-        backrest_top = seat_top + backrest_height
-
-        # Backrest (thin rectangle at the back edge)
-        self.msp.add_lwpolyline([
-            (offset_x + length - leg_width, seat_top),
-            (offset_x + length, seat_top),
-            (offset_x + length, backrest_top),
-            (offset_x + length - leg_width, backrest_top)
-        ], close=True, dxfattribs={"layer": "SIDE_VIEW"})
-
-        # Seat plate
-        self.msp.add_lwpolyline([
-            (offset_x, seat_top - seat_thickness),
-            (offset_x + length, seat_top - seat_thickness),
-            (offset_x + length, seat_top),
-            (offset_x, seat_top)
-        ], close=True, dxfattribs={"layer": "SIDE_VIEW"})
-
-        # Front leg (left in side view)
-        self.msp.add_lwpolyline([
-            (offset_x + leg_width, offset_y),
-            (offset_x + leg_width * 2, offset_y),
-            (offset_x + leg_width * 2, seat_top - seat_thickness),
-            (offset_x + leg_width, seat_top - seat_thickness)
-        ], close=True, dxfattribs={"layer": "SIDE_VIEW"})
-
-        # Back leg (right in side view)
-        rx = length - leg_width * 2
-        self.msp.add_lwpolyline([
-            (offset_x + rx, offset_y),
-            (offset_x + rx + leg_width, offset_y),
-            (offset_x + rx + leg_width, seat_top - seat_thickness),
-            (offset_x + rx, seat_top - seat_thickness)
-        ], close=True, dxfattribs={"layer": "SIDE_VIEW"})
+
+        # Collect all outlines and add them in one batch
+        rect = self._rect_points
+        bottom = seat_top - seat_thickness
+        leg_h = bottom - offset_y
+        rects = [
+            # Backrest (thin rectangle at the back edge)
+            rect(offset_x + length - leg_width, seat_top, leg_width, backrest_height),
+            # Seat plate
+            rect(offset_x, bottom, length, seat_thickness),
+            # Front leg (left in side view)
+            rect(offset_x + leg_width, offset_y, leg_width, leg_h),
+            # Back leg (right in side view)
+            rect(offset_x + length - leg_width * 2, offset_y, leg_width, leg_h),
+        ]
+        self._batch_add_lwpolylines(
+            [(pts, True, "SIDE_VIEW", 0) for pts in rects]
+        )
 
         # Dimensions
         self.add_dimension_line(
@@ -157,182 +146,202 @@ class ChairShape(CADObject):
 class RoomShape(CADObject):
     """
     Architectural room/floor plan with doors and windows.
-    Top view: rectangle + door arcs + window dashed lines
+    Top view: rectangle + door swings + window dashed lines
     Front view: wall elevation with door/window openings
     Side view: side wall elevation with openings
     """
 
+    def __init__(self, params: dict):
+        super().__init__(params)
+        # Resolve dimensions once (in cm); every view reads the attributes
+        self.width = params.get("width", 400)
+        self.length = params.get("length", 500)
+        self.height = height = params.get("height", 300)
+        # Normalize openings once into (wall_id, width, height, sill) rows
+        # so every view reads the same table instead of re-parsing params.
+        self._doors_soa = self._openings_table(
+            params.get("doors"), "south", 80, min(200, height * 0.7), 0
+        )
+        self._windows_soa = self._openings_table(
+            params.get("windows"), "north", 100, min(100, height * 0.3), height * 0.35
+        )
+
+    @staticmethod
+    def _openings_table(items, default_wall: str, default_width: float,
+                        op_height: float, sill: float) -> np.ndarray:
+        """Pack door/window dicts into an (N, 4) float array."""
+        rows = [
+            (
+                _WALL_IDS.get(item.get("wall", default_wall), -1),
+                item.get("width", default_width),
+                op_height,
+                sill,
+            )
+            for item in (items or [])
+            if isinstance(item, dict)
+        ]
+        return np.array(rows, dtype=np.float64).reshape(-1, 4)
+
     def draw_top_view(self):
-        width = self.params.get("width", 400)   # in cm
-        length = self.params.get("length", 500)  # in cm
+        width = self.width
+        length = self.length
 
         # Title
         self.add_title("DENAH RUANGAN (TAMPAK ATAS)", (0, length + 30))
 
         # Room walls
-        wall_points = [
-            (0, 0), (width, 0), (width, length), (0, length)
-        ]
-        self.msp.add_lwpolyline(wall_points, close=True, dxfattribs={"layer": "TOP_VIEW"})
+        self._add_rect(0, 0, width, length, _TOP)
 
         # Draw doors
-        doors = self.params.get("doors") or []
-        for door in doors:
-            if isinstance(door, dict):
-                wall = door.get("wall", "south")
-                door_w = door.get("width", 80)
-                self._draw_door_symbol(wall, door_w, width, length)
+        for wall_id, door_w, _, _ in self._doors_soa.tolist():
+            if wall_id >= 0:
+                self._draw_door_symbol(_WALLS[int(wall_id)], door_w, width, length)
 
         # Draw windows
-        windows = self.params.get("windows") or []
-        for window in windows:
-            if isinstance(window, dict):
-                wall = window.get("wall", "north")
-                win_w = window.get("width", 100)
-                self._draw_window_symbol(wall, win_w, width, length)
+        for wall_id, win_w, _, _ in self._windows_soa.tolist():
+            if wall_id >= 0:
+                self._draw_window_symbol(_WALLS[int(wall_id)], win_w, width, length)
 
         # Dimensions
         self.add_dimension_line((0, 0), (width, 0), offset=25)
         self.add_dimension_line((width, 0), (width, length), offset=-25)
 
     def _draw_door_symbol(self, wall: str, door_width: float, room_w: float, room_l: float):
-        """Draw a door symbol (arc + line) on the specified wall."""
-        if wall == "south":
-            # Door centered on south wall
-            cx = room_w / 2 - door_width / 2
-            # Gap in wall
-            self.msp.add_line(
-                (cx, 0), (cx + door_width, 0),
-                dxfattribs={"layer": "TOP_VIEW", "color": 0}  # background to "erase"
-            )
-            # Door leaf (line)
-            self.msp.add_line(
-                (cx, 0), (cx, door_width),
-                dxfattribs={"layer": "TOP_VIEW"}
-            )
-            # Door arc (90 degree swing)
-            self.msp.add_arc(
-                center=(cx, 0), radius=door_width,
-                start_angle=0, end_angle=90,
-                dxfattribs={"layer": "TOP_VIEW"}
-            )
-        elif wall == "north":
-            cx = room_w / 2 - door_width / 2
-            self.msp.add_line(
-                (cx, room_l), (cx, room_l - door_width),
-                dxfattribs={"layer": "TOP_VIEW"}
-            )
-            self.msp.add_arc(
-                center=(cx, room_l), radius=door_width,
-                start_angle=270, end_angle=360,
-                dxfattribs={"layer": "TOP_VIEW"}
-            )
-        elif wall == "west":
-            cy = room_l / 2 - door_width / 2
-            self.msp.add_line(
-                (0, cy), (door_width, cy),
-                dxfattribs={"layer": "TOP_VIEW"}
-            )
-            self.msp.add_arc(
-                center=(0, cy), radius=door_width,
-                start_angle=0, end_angle=90,
-                dxfattribs={"layer": "TOP_VIEW"}
-            )
-        elif wall == "east":
-            cy = room_l / 2 - door_width / 2
-            self.msp.add_line(
-                (room_w, cy), (room_w - door_width, cy),
-                dxfattribs={"layer": "TOP_VIEW"}
-            )
-            self.msp.add_arc(
-                center=(room_w, cy), radius=door_width,
-                start_angle=90, end_angle=180,
-                dxfattribs={"layer": "TOP_VIEW"}
-            )
+        """Draw a door symbol (leaf line + swing arc polyline) on the specified wall."""
+        handler = self._DOOR_HANDLERS.get(wall)
+        if handler is not None:
+            handler(self, door_width, room_w, room_l)
+
+    def _door_south(self, door_width: float, room_w: float, room_l: float):
+        # Door centered on south wall
+        cx = room_w / 2 - door_width / 2
+        # Gap in wall
+        self.msp.add_line(
+            (cx, 0), (cx + door_width, 0),
+            dxfattribs=_TOP_BG  # background to "erase"
+        )
+        # Door leaf (line)
+        self.msp.add_line((cx, 0), (cx, door_width), dxfattribs=_TOP)
+        # Door swing (90 degree arc, pre-tessellated)
+        self.msp.add_lwpolyline(
+            self._arc_polyline(cx, 0, door_width, 0, 90),
+            format="xy", dxfattribs=_TOP
+        )
+
+    def _door_north(self, door_width: float, room_w: float, room_l: float):
+        cx = room_w / 2 - door_width / 2
+        self.msp.add_line((cx, room_l), (cx, room_l - door_width), dxfattribs=_TOP)
+        self.msp.add_lwpolyline(
+            self._arc_polyline(cx, room_l, door_width, 270, 360),
+            format="xy", dxfattribs=_TOP
+        )
+
+    def _door_west(self, door_width: float, room_w: float, room_l: float):
+        cy = room_l / 2 - door_width / 2
+        self.msp.add_line((0, cy), (door_width, cy), dxfattribs=_TOP)
+        self.msp.add_lwpolyline(
+            self._arc_polyline(0, cy, door_width, 0, 90),
+            format="xy", dxfattribs=_TOP
+        )
+
+    def _door_east(self, door_width: float, room_w: float, room_l: float):
+        cy = room_l / 2 - door_width / 2
+        self.msp.add_line((room_w, cy), (room_w - door_width, cy), dxfattribs=_TOP)
+        self.msp.add_lwpolyline(
+            self._arc_polyline(room_w, cy, door_width, 90, 180),
+            format="xy", dxfattribs=_TOP
+        )
+
+    _DOOR_HANDLERS = {
+        "south": _door_south,
+        "north": _door_north,
+        "west": _door_west,
+        "east": _door_east,
+    }
 
     def _draw_window_symbol(self, wall: str, win_width: float, room_w: float, room_l: float):
         """Draw window symbol (3 parallel lines) on the specified wall."""
-        wall_thickness = 3
-
-        if wall == "north":
-            cx = room_w / 2 - win_width / 2
-            for offset in [-wall_thickness, 0, wall_thickness]:
-                self.msp.add_line(
-                    (cx, room_l + offset), (cx + win_width, room_l + offset),
-                    dxfattribs={"layer": "TOP_VIEW"}
-                )
-        elif wall == "south":
-            cx = room_w / 2 - win_width / 2
-            for offset in [-wall_thickness, 0, wall_thickness]:
-                self.msp.add_line(
-                    (cx, offset), (cx + win_width, offset),
-                    dxfattribs={"layer": "TOP_VIEW"}
-                )
-        elif wall == "east":
-            cy = room_l / 2 - win_width / 2
-            for offset in [-wall_thickness, 0, wall_thickness]:
-                self.msp.add_line(
-                    (room_w + offset, cy), (room_w + offset, cy + win_width),
-                    dxfattribs={"layer": "TOP_VIEW"}
-                )
-        elif wall == "west":
-            cy = room_l / 2 - win_width / 2
-            for offset in [-wall_thickness, 0, wall_thickness]:
-                self.msp.add_line(
-                    (offset, cy), (offset, cy + win_width),
-                    dxfattribs={"layer": "TOP_VIEW"}
-                )
+        handler = self._WINDOW_HANDLERS.get(wall)
+        if handler is not None:
+            self._batch_add_lines(handler(win_width, room_w, room_l), "TOP_VIEW")
+
+    # Window handlers return the (start, end) pairs of the three lines
+
+    @staticmethod
+    def _window_north(win_width: float, room_w: float, room_l: float) -> list:
+        cx = room_w / 2 - win_width / 2
+        return [
+            ((cx, room_l + offset), (cx + win_width, room_l + offset))
+            for offset in _WINDOW_OFFSETS
+        ]
+
+    @staticmethod
+    def _window_south(win_width: float, room_w: float, room_l: float) -> list:
+        cx = room_w / 2 - win_width / 2
+        return [
+            ((cx, offset), (cx + win_width, offset))
+            for offset in _WINDOW_OFFSETS
+        ]
+
+    @staticmethod
+    def _window_east(win_width: float, room_w: float, room_l: float) -> list:
+        cy = room_l / 2 - win_width / 2
+        return [
+            ((room_w + offset, cy), (room_w + offset, cy + win_width))
+            for offset in _WINDOW_OFFSETS
+        ]
+
+    @staticmethod
+    def _window_west(win_width: float, room_w: float, room_l: float) -> list:
+        cy = room_l / 2 - win_width / 2
+        return [
+            ((offset, cy), (offset, cy + win_width))
+            for offset in _WINDOW_OFFSETS
+        ]
+
+    _WINDOW_HANDLERS = {
+        "north": _window_north.__func__,
+        "south": _window_south.__func__,
+        "east": _window_east.__func__,
+        "west": _window_west.__func__,
+    }
 
     def draw_front_view(self):
-        width = self.params.get("width", 400)
-        height = self.params.get("height", 300)
+        width = self.width
+        height = self.height
         offset_y = self.VIEW_GAP - 100  # Extra gap for room
 
         # Title
         self.add_title("TAMPAK DEPAN", (0, offset_y + height + 15))
 
         # Wall outline
-        wall_points = [
-            (0, offset_y), (width, offset_y),
-            (width, offset_y + height), (0, offset_y + height)
-        ]
-        self.msp.add_lwpolyline(wall_points, close=True, dxfattribs={"layer": "FRONT_VIEW"})
+        self._add_rect(0, offset_y, width, height, _FRONT)
+
+        rect = self._rect_points
+        openings = []
 
         # Door opening (south wall, front view)
-        doors = self.params.get("doors") or []
-        for door in doors:
-            if isinstance(door, dict):
-                door_w = door.get("width", 80)
-                door_h = min(200, height * 0.7)
-                cx = width / 2 - door_w / 2
-                # Door opening rectangle
-                self.msp.add_lwpolyline([
-                    (cx, offset_y), (cx + door_w, offset_y),
-                    (cx + door_w, offset_y + door_h), (cx, offset_y + door_h)
-                ], close=True, dxfattribs={"layer": "FRONT_VIEW"})
+        for _, door_w, door_h, _ in self._doors_soa.tolist():
+            cx = width / 2 - door_w / 2
+            # Door opening rectangle
+            openings.append(rect(cx, offset_y, door_w, door_h))
 
         # Window opening
-        windows = self.params.get("windows") or []
-        for window in windows:
-            if isinstance(window, dict):
-                win_w = window.get("width", 100)
-                win_h = min(100, height * 0.3)
-                sill_h = height * 0.35  # window sill height
-                cx = width / 2 - win_w / 2
-                self.msp.add_lwpolyline([
-                    (cx, offset_y + sill_h),
-                    (cx + win_w, offset_y + sill_h),
-                    (cx + win_w, offset_y + sill_h + win_h),
-                    (cx, offset_y + sill_h + win_h)
-                ], close=True, dxfattribs={"layer": "FRONT_VIEW"})
+        for _, win_w, win_h, sill_h in self._windows_soa.tolist():
+            cx = width / 2 - win_w / 2
+            openings.append(rect(cx, offset_y + sill_h, win_w, win_h))
+
+        self._batch_add_lwpolylines(
+            [(pts, True, "FRONT_VIEW", 0) for pts in openings]
+        )
 
         # Dimensions
         self.add_dimension_line((0, offset_y), (width, offset_y), offset=25)
         self.add_dimension_line((0, offset_y), (0, offset_y + height), offset=25)
 
     def draw_side_view(self):
-        length = self.params.get("length", 500)
-        height = self.params.get("height", 300)
+        length = self.length
+        height = self.height
         offset_x = self.SIDE_GAP + 200  # Extra offset for large rooms
         offset_y = self.VIEW_GAP - 100
 
@@ -340,43 +349,27 @@ class RoomShape(CADObject):
         self.add_title("TAMPAK SAMPING", (offset_x, offset_y + height + 15))
 
         # Side wall outline
-        wall_points = [
-            (offset_x, offset_y),
-            (offset_x + length, offset_y),
-            (offset_x + length, offset_y + height),
-            (offset_x, offset_y + height)
-        ]
-        self.msp.add_lwpolyline(wall_points, close=True, dxfattribs={"layer": "SIDE_VIEW"})
+        self._add_rect(offset_x, offset_y, length, height, _SIDE)
+
+        rect = self._rect_points
+        openings = []
 
         # Check for doors/windows on east or west walls (visible from side)
-        doors = self.params.get("doors") or []
-        for door in doors:
-            if isinstance(door, dict):
-                wall = door.get("wall", "south")
-                if wall in ("east", "west"):
-                    door_w = door.get("width", 80)
-                    door_h = min(200, height * 0.7)
-                    cx = offset_x + length / 2 - door_w / 2
-                    self.msp.add_lwpolyline([
-                        (cx, offset_y), (cx + door_w, offset_y),
-                        (cx + door_w, offset_y + door_h), (cx, offset_y + door_h)
-                    ], close=True, dxfattribs={"layer": "SIDE_VIEW"})
-
-        windows = self.params.get("windows") or []
-        for window in windows:
-            if isinstance(window, dict):
-                wall = window.get("wall", "north")
-                if wall in ("east", "west"):
-                    win_w = window.get("width", 100)
-                    win_h = min(100, height * 0.3)
-                    sill_h = height * 0.35
-                    cx = offset_x + length / 2 - win_w / 2
-                    self.msp.add_lwpolyline([
-                        (cx, offset_y + sill_h),
-                        (cx + win_w, offset_y + sill_h),
-                        (cx + win_w, offset_y + sill_h + win_h),
-                        (cx, offset_y + sill_h + win_h)
-                    ], close=True, dxfattribs={"layer": "SIDE_VIEW"})
+        doors = self._doors_soa
+        side_doors = doors[np.isin(doors[:, 0], (WALL_EAST, WALL_WEST))]
+        for _, door_w, door_h, _ in side_doors.tolist():
+            cx = offset_x + length / 2 - door_w / 2
+            openings.append(rect(cx, offset_y, door_w, door_h))
+
+        windows = self._windows_soa
+        side_windows = windows[np.isin(windows[:, 0], (WALL_EAST, WALL_WEST))]
+        for _, win_w, win_h, sill_h in side_windows.tolist():
+            cx = offset_x + length / 2 - win_w / 2
+            openings.append(rect(cx, offset_y + sill_h, win_w, win_h))
+
+        self._batch_add_lwpolylines(
+            [(pts, True, "SIDE_VIEW", 0) for pts in openings]
+        )
 
         # Dimensions
         self.add_dimension_line(
@@ -1,6 +1,23 @@
 """Abstract Base Class for all CAD objects."""
 from abc import ABC, abstractmethod
+import math
 import ezdxf
+import numpy as np
+from ezdxf.entities import Line, LWPolyline
+
+from app.cad_engine.svg_exporter import modelspace_to_svg
+
+# Shared DXF attribute dicts for the standard layers, used by every shape
+# module. ezdxf copies dxfattribs on every add_*() call, so passing the
+# same dict object around is safe.
+_TOP = {"layer": "TOP_VIEW"}
+_FRONT = {"layer": "FRONT_VIEW"}
+_SIDE = {"layer": "SIDE_VIEW"}
+_CL = {"layer": "CENTER_LINES"}
+_DIM = {"layer": "DIMENSIONS"}
+# Text attribute templates; copied per call, then the insert point is set
+_TITLE_BASE = {"height": 5, "layer": "ANNOTATIONS"}
+_DIM_TEXT_BASE = {"height": 3, "layer": "DIMENSIONS"}
 
 
 class CADObject(ABC):
@@ -14,6 +31,16 @@ class CADObject(ABC):
     # Horizontal offset for side view (placed to the right of front view)
     SIDE_GAP = 250
 
+    # Standard layers as (name, ACI color)
+    _LAYERS = (
+        ("TOP_VIEW", 7),       # White
+        ("FRONT_VIEW", 5),     # Blue
+        ("SIDE_VIEW", 4),      # Cyan
+        ("DIMENSIONS", 1),     # Red
+        ("ANNOTATIONS", 3),    # Green
+        ("CENTER_LINES", 2),   # Yellow
+    )
+
     def __init__(self, params: dict):
         self.params = params
         self.doc = ezdxf.new(dxfversion="R2010")
@@ -22,12 +49,11 @@ class CADObject(ABC):
 
     def _setup_layers(self):
         """Create standard CAD layers for organization."""
-        self.doc.layers.add("TOP_VIEW", color=7)       # White
-        self.doc.layers.add("FRONT_VIEW", color=5)      # Blue
-        self.doc.layers.add("SIDE_VIEW", color=4)        # Cyan
-        self.doc.layers.add("DIMENSIONS", color=1)       # Red
-        self.doc.layers.add("ANNOTATIONS", color=3)      # Green
-        self.doc.layers.add("CENTER_LINES", color=2)     # Yellow
+        new_layer = self.doc.layers.new
+        for name, color in self._LAYERS:
+            # layers.new() skips the keyword handling of layers.add();
+            # it mutates dxfattribs, so each call gets a fresh dict.
+            new_layer(name, dxfattribs={"color": color})
 
     @abstractmethod
     def draw_top_view(self):
@@ -44,80 +70,130 @@ class CADObject(ABC):
         """Draw the side view (right elevation), offset to the right."""
         pass
 
+    def draw_all(self):
+        """Draw top, front and side views in one call (the usual full sheet)."""
+        self.draw_top_view()
+        self.draw_front_view()
+        self.draw_side_view()
+
     def add_title(self, text: str, position: tuple, height: float = 5):
         """Add a text annotation."""
-        self.msp.add_text(
-            text,
-            dxfattribs={
-                "insert": position,
-                "height": height,
-                "layer": "ANNOTATIONS",
-            }
-        )
+        attrs = _TITLE_BASE.copy()
+        attrs["insert"] = position
+        attrs["height"] = height
+        self.msp.add_text(text, dxfattribs=attrs)
 
     def add_dimension_line(self, start: tuple, end: tuple, offset: float = 10):
         """Add a simple dimension indicator using lines and text."""
-        import math
         dx = end[0] - start[0]
         dy = end[1] - start[1]
-        length = math.sqrt(dx * dx + dy * dy)
+        adx = abs(dx)
+        ady = abs(dy)
+        # Dimensions are always axis-aligned, so the length is the larger delta
+        length = adx if adx > ady else ady
+
+        add_line = self.msp.add_line
 
         # Perpendicular direction for offset
-        if abs(dx) > abs(dy):
+        if adx > ady:
             # Horizontal dimension
             y_off = start[1] - offset
-            self.msp.add_line(
-                (start[0], y_off), (end[0], y_off),
-                dxfattribs={"layer": "DIMENSIONS"}
-            )
+            add_line((start[0], y_off), (end[0], y_off), dxfattribs=_DIM)
             # Extension lines
-            self.msp.add_line(
-                (start[0], start[1]), (start[0], y_off),
-                dxfattribs={"layer": "DIMENSIONS"}
-            )
-            self.msp.add_line(
-                (end[0], end[1]), (end[0], y_off),
-                dxfattribs={"layer": "DIMENSIONS"}
-            )
+            add_line((start[0], start[1]), (start[0], y_off), dxfattribs=_DIM)
+            add_line((end[0], end[1]), (end[0], y_off), dxfattribs=_DIM)
             # Text
             mid_x = (start[0] + end[0]) / 2
-            self.msp.add_text(
-                f"{length:.0f}",
-                dxfattribs={
-                    "insert": (mid_x, y_off - 5),
-                    "height": 3,
-                    "layer": "DIMENSIONS",
-                }
-            )
+            insert = (mid_x, y_off - 5)
         else:
             # Vertical dimension
             x_off = start[0] - offset
-            self.msp.add_line(
-                (x_off, start[1]), (x_off, end[1]),
-                dxfattribs={"layer": "DIMENSIONS"}
-            )
-            self.msp.add_line(
-                (start[0], start[1]), (x_off, start[1]),
-                dxfattribs={"layer": "DIMENSIONS"}
-            )
-            self.msp.add_line(
-                (end[0], end[1]), (x_off, end[1]),
-                dxfattribs={"layer": "DIMENSIONS"}
-            )
+            add_line((x_off, start[1]), (x_off, end[1]), dxfattribs=_DIM)
+            add_line((start[0], start[1]), (x_off, start[1]), dxfattribs=_DIM)
+            add_line((end[0], end[1]), (x_off, end[1]), dxfattribs=_DIM)
             mid_y = (start[1] + end[1]) / 2
-            self.msp.add_text(
-                f"{length:.0f}",
-                dxfattribs={
-                    "insert": (x_off - 8, mid_y),
-                    "height": 3,
-                    "layer": "DIMENSIONS",
-                }
+            insert = (x_off - 8, mid_y)
+
+        attrs = _DIM_TEXT_BASE.copy()
+        attrs["insert"] = insert
+        self.msp.add_text(f"{length:.0f}", dxfattribs=attrs)
+
+    @staticmethod
+    def _rect_points(x: float, y: float, w: float, h: float) -> tuple:
+        """Corner points of an axis-aligned rectangle, counter-clockwise from (x, y)."""
+        return ((x, y), (x + w, y), (x + w, y + h), (x, y + h))
+
+    def _add_rect(self, x: float, y: float, w: float, h: float, dxfattribs: dict):
+        """Add a closed axis-aligned rectangle as an LWPOLYLINE."""
+        return self.msp.add_lwpolyline(
+            self._rect_points(x, y, w, h), close=True, dxfattribs=dxfattribs
+        )
+
+    @staticmethod
+    def _arc_polyline(cx: float, cy: float, r: float,
+                      start_deg: float, end_deg: float, tol: float = 0.2) -> list:
+        """
+        Tessellate an arc into polyline points (counter-clockwise).
+        The segment count keeps the chord deviation (sagitta) below tol:
+        n = ceil(sweep / sqrt(8 * tol / r)), with at least 4 segments.
+        """
+        start = math.radians(start_deg)
+        sweep = math.radians(end_deg) - start
+        n = max(4, math.ceil(sweep / math.sqrt(8 * tol / max(r, tol))))
+        t = np.linspace(start, start + sweep, n + 1)
+        return np.column_stack((cx + r * np.cos(t), cy + r * np.sin(t))).tolist()
+
+    def _batch_add_lwpolylines(self, specs: list):
+        """
+        Add many LWPOLYLINE entities to modelspace in one go.
+        specs: list of (points, close, layer, const_width) tuples.
+        Builds the entities directly instead of going through
+        msp.add_lwpolyline(), which copies dxfattribs and re-resolves the
+        layout on every call.
+        """
+        doc = self.doc
+        db_add = doc.entitydb.add
+        owner = self.msp.block_record.dxf.handle
+        entities = []
+        for points, close, layer, const_width in specs:
+            dxfattribs = {"layer": layer}
+            if const_width:
+                dxfattribs["const_width"] = const_width
+            pl = LWPolyline.new(dxfattribs=dxfattribs, doc=doc)
+            pl.set_points(points, format="xy")
+            pl.closed = close
+            db_add(pl)  # assigns the next free handle
+            pl.set_owner(owner)
+            entities.append(pl)
+        self.msp.entity_space.extend(entities)
+
+    def _batch_add_lines(self, lines: list, layer: str):
+        """
+        Add many LINE entities on one layer to modelspace in one go.
+        lines: list of (start, end) point pairs. Same direct-construction
+        path as _batch_add_lwpolylines().
+        """
+        doc = self.doc
+        db_add = doc.entitydb.add
+        owner = self.msp.block_record.dxf.handle
+        entities = []
+        for start, end in lines:
+            line = Line.new(
+                dxfattribs={"layer": layer, "start": start, "end": end}, doc=doc
             )
+            db_add(line)
+            line.set_owner(owner)
+            entities.append(line)
+        self.msp.entity_space.extend(entities)
 
     def save(self, filepath: str):
         """Save the DXF document to disk."""
         self.doc.saveas(filepath)
 
+    def render_svg(self, width: int = 800, height: int = 600) -> str:
+        """Render the in-memory drawing as an SVG preview (no DXF re-read)."""
+        return modelspace_to_svg(self.msp, width, height)
+
     def get_params_summary(self) -> dict:
         """Return a clean summary of parameters for API response."""
         summary = {}
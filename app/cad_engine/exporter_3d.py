@@ -1,36 +1,60 @@
 """3D Exporter — Create 3D mesh from CAD parameters and export as STL."""
+import struct
+from typing import TYPE_CHECKING
 import numpy as np
 
-try:
+if TYPE_CHECKING:
     import trimesh
-    HAS_TRIMESH = True
-except ImportError:
-    HAS_TRIMESH = False
+
+# trimesh (and its scipy/networkx imports) is only loaded on the first
+# export, so importing this module stays cheap for the 2D-only path.
+_trimesh = None
+
+
+def _get_trimesh():
+    """Import trimesh on first use and cache the module (None if missing)."""
+    global _trimesh
+    if _trimesh is None:
+        try:
+            import trimesh as _t
+        except ImportError:
+            return None
+        _trimesh = _t
+    return _trimesh
+
+
+# Unit cube centered at the origin (same layout as trimesh.creation.box()).
+# Every box in a mesh is this template scaled by its extents and shifted
+# to its center, so N boxes become one vertex/face array pair.
+_UNIT_BOX_V = np.array([
+    [-0.5, -0.5, -0.5], [-0.5, -0.5, 0.5], [-0.5, 0.5, -0.5], [-0.5, 0.5, 0.5],
+    [0.5, -0.5, -0.5], [0.5, -0.5, 0.5], [0.5, 0.5, -0.5], [0.5, 0.5, 0.5],
+], dtype=np.float64)
+_UNIT_BOX_F = np.array([
+    [1, 3, 0], [4, 1, 0], [0, 3, 2], [2, 4, 0], [1, 7, 3], [5, 1, 4],
+    [5, 7, 1], [3, 7, 2], [6, 4, 2], [2, 7, 6], [6, 5, 4], [7, 5, 6],
+], dtype=np.int64)
 
 
 def export_3d_stl(params: dict, output_path: str) -> bool:
     """
     Create a simple 3D mesh from CAD parameters and save as STL.
-    Uses trimesh.creation primitives (no triangulation engine needed).
+    Meshes are scaled unit box/cylinder templates (no triangulation needed).
     Returns True on success, False on failure.
     """
-    if not HAS_TRIMESH:
+    if _get_trimesh() is None:
         print("trimesh not installed, skipping 3D export")
         return False
 
     shape_type = params.get("shape_type", "box").lower()
 
     try:
-        if shape_type in ("cylinder", "bundar", "bulat", "silinder"):
-            mesh = _create_cylinder_mesh(params)
-        elif shape_type == "chair":
-            mesh = _create_chair_mesh(params)
-        elif shape_type in ("room", "ruangan", "kamar"):
-            mesh = _create_room_mesh(params)
-        else:
-            mesh = _create_box_mesh(params)
+        mesh = _MESH_FACTORIES.get(shape_type, _create_box_mesh)(params)
 
-        mesh.export(output_path, file_type="stl")
+        if output_path.lower().endswith(".stl"):
+            _stl_binary_write(mesh, output_path)
+        else:
+            mesh.export(output_path, file_type="stl")
         return True
 
     except Exception as e:
@@ -38,28 +62,61 @@ def export_3d_stl(params: dict, output_path: str) -> bool:
         return False
 
 
+# Unit cylinder (radius 1, height 1, 32 sections) as (vertices, faces);
+# generated by trimesh on first use, then only scaled per export
+_unit_cylinder = None
+
+
+def _get_unit_cylinder() -> tuple:
+    """Build the unit cylinder template once and cache it."""
+    global _unit_cylinder
+    if _unit_cylinder is None:
+        cyl = _get_trimesh().creation.cylinder(radius=1.0, height=1.0, sections=32)
+        _unit_cylinder = (cyl.vertices.copy(), cyl.faces.copy())
+    return _unit_cylinder
+
+
+# Row index of each wall in the room wall table
+_WALL_INDEX = {"south": 0, "north": 1, "west": 2, "east": 3}
+
+# Binary STL facet record: normal, 3 vertices, attribute byte count
+_STL_DTYPE = np.dtype([("n", "<f4", (3,)), ("v", "<f4", (9,)), ("attr", "<u2")])
+
+
+def _stl_binary_write(mesh, path: str):
+    """Write mesh as binary STL with a single structured-array dump."""
+    faces = np.empty(len(mesh.faces), dtype=_STL_DTYPE)
+    faces["n"] = mesh.face_normals
+    faces["v"] = mesh.triangles.reshape(-1, 9)
+    faces["attr"] = 0
+    with open(path, "wb") as f:
+        f.write(struct.pack("<80sI", b"", len(faces)))
+        faces.tofile(f)
+
+
 def _create_box_mesh(params: dict) -> "trimesh.Trimesh":
-    """Create a box mesh using trimesh.creation.box (no triangulation needed)."""
+    """Create a box mesh from the unit-box template (no triangulation needed)."""
     width = params.get("width", 100) / 100   # cm → m
     length = params.get("length", 100) / 100
     height = params.get("height", 50) / 100
 
-    mesh = trimesh.creation.box(extents=[width, length, height])
-    # Move so bottom sits at Z=0
-    mesh.apply_translation([width / 2, length / 2, height / 2])
-    return mesh
+    # Bottom sits at Z=0
+    return _boxes_to_mesh(
+        [[width, length, height]],
+        [[width / 2, length / 2, height / 2]]
+    )
 
 
 def _create_cylinder_mesh(params: dict) -> "trimesh.Trimesh":
-    """Create a cylinder mesh using trimesh.creation.cylinder."""
+    """Create a cylinder mesh by scaling the cached unit cylinder."""
     diameter = params.get("diameter", 100) / 100  # cm → m
     height = params.get("height", 100) / 100
     radius = diameter / 2
 
-    mesh = trimesh.creation.cylinder(radius=radius, height=height, sections=32)
-    # Move so bottom sits at Z=0
-    mesh.apply_translation([0, 0, height / 2])
-    return mesh
+    unit_v, unit_f = _get_unit_cylinder()
+    # Scale radius/height and move so bottom sits at Z=0
+    verts = unit_v * np.array([radius, radius, height]) + np.array([0, 0, height / 2])
+    return _get_trimesh().Trimesh(vertices=verts, faces=unit_f, process=False)
 
 
 def _create_chair_mesh(params: dict) -> "trimesh.Trimesh":
@@ -70,35 +127,28 @@ def _create_chair_mesh(params: dict) -> "trimesh.Trimesh":
     seat_t = 0.03  # 3cm seat thickness
     leg_w = 0.03   # 3cm leg width
 
-    parts = []
-
     # Seat plate
-    seat = trimesh.creation.box(extents=[width, length, seat_t])
-    seat.apply_translation([width / 2, length / 2, height + seat_t / 2])
-    parts.append(seat)
+    seat_extents = np.array([[width, length, seat_t]])
+    seat_centers = np.array([[width / 2, length / 2, height + seat_t / 2]])
 
     # 4 Legs at corners
     margin = 0.03
-    leg_positions = [
-        (margin + leg_w / 2, margin + leg_w / 2),
-        (width - margin - leg_w / 2, margin + leg_w / 2),
-        (width - margin - leg_w / 2, length - margin - leg_w / 2),
-        (margin + leg_w / 2, length - margin - leg_w / 2),
-    ]
-    for lx, ly in leg_positions:
-        leg = trimesh.creation.box(extents=[leg_w, leg_w, height])
-        leg.apply_translation([lx, ly, height / 2])
-        parts.append(leg)
+    near = margin + leg_w / 2
+    leg_xs = np.array([near, width - near, width - near, near])
+    leg_ys = np.array([near, near, length - near, length - near])
+    leg_centers = np.column_stack([leg_xs, leg_ys, np.full(4, height / 2)])
+    leg_extents = np.tile([leg_w, leg_w, height], (4, 1))
 
     # Backrest
     backrest_h = 0.20
-    backrest = trimesh.creation.box(extents=[width, seat_t, backrest_h])
-    backrest.apply_translation([width / 2, length, height + seat_t + backrest_h / 2])
-    parts.append(backrest)
+    back_extents = np.array([[width, seat_t, backrest_h]])
+    back_centers = np.array([[width / 2, length, height + seat_t + backrest_h / 2]])
 
     # Combine all parts
-    combined = trimesh.util.concatenate(parts)
-    return combined
+    return _boxes_to_mesh(
+        np.concatenate([seat_extents, leg_extents, back_extents]),
+        np.concatenate([seat_centers, leg_centers, back_centers])
+    )
 
 
 def _create_room_mesh(params: dict) -> "trimesh.Trimesh":
@@ -111,145 +161,142 @@ def _create_room_mesh(params: dict) -> "trimesh.Trimesh":
     height = params.get("height", 300) / 100
     wall_t = 0.15  # 15cm wall thickness
 
-    parts = []
-
     # ── Floor slab ──
-    floor = trimesh.creation.box(extents=[width, length, wall_t])
-    floor.apply_translation([width / 2, length / 2, -wall_t / 2])
-    parts.append(floor)
+    floor_extents = np.array([[width, length, wall_t]])
+    floor_centers = np.array([[width / 2, length / 2, -wall_t / 2]])
 
-    # ── Collect openings per wall ──
-    wall_openings: dict[str, list] = {
-        "south": [], "north": [], "west": [], "east": []
-    }
+    # ── Collect openings as (wall_index, w, h, sill) rows ──
+    openings = []
 
     for door in (params.get("doors") or []):
         if isinstance(door, dict):
-            wall = door.get("wall", "south")
+            wall = _WALL_INDEX.get(door.get("wall", "south"))
             door_w = door.get("width", 80) / 100
             door_h = min(2.0, height * 0.7)  # max 2m or 70% of wall
-            if wall in wall_openings:
-                wall_openings[wall].append({
-                    "type": "door", "w": door_w, "h": door_h, "sill": 0
-                })
+            if wall is not None:
+                openings.append((wall, door_w, door_h, 0.0))
 
     for window in (params.get("windows") or []):
         if isinstance(window, dict):
-            wall = window.get("wall", "north")
+            wall = _WALL_INDEX.get(window.get("wall", "north"))
             win_w = window.get("width", 100) / 100
             win_h = min(1.0, height * 0.3)
             sill_h = height * 0.35
-            if wall in wall_openings:
-                wall_openings[wall].append({
-                    "type": "window", "w": win_w, "h": win_h, "sill": sill_h
-                })
-
-    # ── Build each wall ──
-    # South wall: along X axis at Y=0
-    parts.extend(_build_wall_segments(
-        wall_len=width, wall_h=height, wall_t=wall_t,
-        openings=wall_openings["south"],
-        origin=(0, 0, 0), axis="x"
-    ))
-
-    # North wall: along X axis at Y=length
-    parts.extend(_build_wall_segments(
-        wall_len=width, wall_h=height, wall_t=wall_t,
-        openings=wall_openings["north"],
-        origin=(0, length - wall_t, 0), axis="x"
-    ))
-
-    # West wall: along Y axis at X=0
-    parts.extend(_build_wall_segments(
-        wall_len=length, wall_h=height, wall_t=wall_t,
-        openings=wall_openings["west"],
-        origin=(0, 0, 0), axis="y"
-    ))
-
-    # East wall: along Y axis at X=width
-    parts.extend(_build_wall_segments(
-        wall_len=length, wall_h=height, wall_t=wall_t,
-        openings=wall_openings["east"],
-        origin=(width - wall_t, 0, 0), axis="y"
-    ))
-
-    combined = trimesh.util.concatenate(parts)
-    return combined
-
-
-def _build_wall_segments(
-    wall_len: float, wall_h: float, wall_t: float,
-    openings: list, origin: tuple, axis: str
-) -> list:
+            if wall is not None:
+                openings.append((wall, win_w, win_h, sill_h))
+
+    # ── Build all four walls in one pass ──
+    # Rows follow _WALL_INDEX: (wall_len, origin_x, origin_y, runs_along_x)
+    walls = np.array([
+        (width, 0, 0, 1),                 # South wall: along X at Y=0
+        (width, 0, length - wall_t, 1),   # North wall: along X at Y=length
+        (length, 0, 0, 0),                # West wall: along Y at X=0
+        (length, width - wall_t, 0, 0),   # East wall: along Y at X=width
+    ], dtype=np.float64)
+    wall_extents, wall_centers = _build_walls(
+        walls, np.array(openings, dtype=np.float64).reshape(-1, 4),
+        wall_h=height, wall_t=wall_t
+    )
+
+    return _boxes_to_mesh(
+        np.concatenate([floor_extents, wall_extents]),
+        np.concatenate([floor_centers, wall_centers])
+    )
+
+
+# Shape type (and alias) → mesh builder; anything else is exported as a box
+_MESH_FACTORIES = {
+    "box": _create_box_mesh,
+    "cylinder": _create_cylinder_mesh,
+    "bundar": _create_cylinder_mesh,
+    "bulat": _create_cylinder_mesh,
+    "silinder": _create_cylinder_mesh,
+    "chair": _create_chair_mesh,
+    "room": _create_room_mesh,
+    "ruangan": _create_room_mesh,
+    "kamar": _create_room_mesh,
+}
+
+
+def _boxes_to_mesh(extents, centers) -> "trimesh.Trimesh":
     """
-    Build a wall as box segments, leaving gaps for openings.
-    axis='x' means wall runs along X; axis='y' means along Y.
-    Returns a list of trimesh box meshes.
+    Fuse N axis-aligned boxes into a single mesh.
+    extents/centers: (N, 3) array-likes. The unit cube template is scaled
+    and translated for all boxes at once; process=False skips the vertex
+    merge since the boxes are disjoint and already consistently wound.
     """
-    ox, oy, oz = origin
-    segments = []
-
-    if not openings:
-        # Solid wall, no openings
-        if axis == "x":
-            wall = trimesh.creation.box(extents=[wall_len, wall_t, wall_h])
-            wall.apply_translation([ox + wall_len / 2, oy + wall_t / 2, wall_h / 2])
-        else:
-            wall = trimesh.creation.box(extents=[wall_t, wall_len, wall_h])
-            wall.apply_translation([ox + wall_t / 2, oy + wall_len / 2, wall_h / 2])
-        return [wall]
-
-    # Center each opening along the wall
-    for opening in openings:
-        op_w = opening["w"]
-        op_h = opening["h"]
-        sill = opening["sill"]  # bottom of opening (0 for doors)
-        op_center = wall_len / 2  # centered on wall
-        op_left = op_center - op_w / 2
-        op_right = op_center + op_w / 2
-        op_top = sill + op_h
-
-        # Left segment (full height)
-        if op_left > 0.01:
-            seg_w = op_left
-            if axis == "x":
-                seg = trimesh.creation.box(extents=[seg_w, wall_t, wall_h])
-                seg.apply_translation([ox + seg_w / 2, oy + wall_t / 2, wall_h / 2])
-            else:
-                seg = trimesh.creation.box(extents=[wall_t, seg_w, wall_h])
-                seg.apply_translation([ox + wall_t / 2, oy + seg_w / 2, wall_h / 2])
-            segments.append(seg)
-
-        # Right segment (full height)
-        if op_right < wall_len - 0.01:
-            seg_w = wall_len - op_right
-            if axis == "x":
-                seg = trimesh.creation.box(extents=[seg_w, wall_t, wall_h])
-                seg.apply_translation([ox + op_right + seg_w / 2, oy + wall_t / 2, wall_h / 2])
-            else:
-                seg = trimesh.creation.box(extents=[wall_t, seg_w, wall_h])
-                seg.apply_translation([ox + wall_t / 2, oy + op_right + seg_w / 2, wall_h / 2])
-            segments.append(seg)
-
-        # Above opening (lintel)
-        if op_top < wall_h - 0.01:
-            lintel_h = wall_h - op_top
-            if axis == "x":
-                seg = trimesh.creation.box(extents=[op_w, wall_t, lintel_h])
-                seg.apply_translation([ox + op_center, oy + wall_t / 2, op_top + lintel_h / 2])
-            else:
-                seg = trimesh.creation.box(extents=[wall_t, op_w, lintel_h])
-                seg.apply_translation([ox + wall_t / 2, oy + op_center, op_top + lintel_h / 2])
-            segments.append(seg)
-
-        # Below opening (sill wall — for windows)
-        if sill > 0.01:
-            if axis == "x":
-                seg = trimesh.creation.box(extents=[op_w, wall_t, sill])
-                seg.apply_translation([ox + op_center, oy + wall_t / 2, sill / 2])
-            else:
-                seg = trimesh.creation.box(extents=[wall_t, op_w, sill])
-                seg.apply_translation([ox + wall_t / 2, oy + op_center, sill / 2])
-            segments.append(seg)
-
-    return segments
+    E = np.asarray(extents, dtype=np.float64)
+    C = np.asarray(centers, dtype=np.float64)
+    n = len(E)
+    verts = (_UNIT_BOX_V[None, :, :] * E[:, None, :] + C[:, None, :]).reshape(-1, 3)
+    faces = (_UNIT_BOX_F[None, :, :] + (np.arange(n) * 8)[:, None, None]).reshape(-1, 3)
+    return _get_trimesh().Trimesh(vertices=verts, faces=faces, process=False)
+
+
+def _build_walls(
+    walls: np.ndarray, openings: np.ndarray, wall_h: float, wall_t: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Build every wall as box segments, leaving gaps for openings.
+    walls: (W, 4) array of (wall_len, origin_x, origin_y, runs_along_x) rows.
+    openings: (N, 4) array of (wall_index, w, h, sill) rows; each opening
+    is centered on its wall.
+    Returns (extents, centers) as (M, 3) arrays, one row per box, grouped
+    by wall.
+    """
+    wall_len, origin_x, origin_y, along_x = walls.T
+
+    idx = openings[:, 0].astype(np.intp)
+    op_w, op_h, sill = openings[:, 1], openings[:, 2], openings[:, 3]  # sill is 0 for doors
+    seg_len = wall_len[idx]
+    op_center = seg_len / 2
+    op_left = op_center - op_w / 2
+    op_right = op_center + op_w / 2
+    op_top = sill + op_h
+    full_h = np.full_like(op_w, wall_h)
+    lintel_h = wall_h - op_top
+    right_w = seg_len - op_right
+
+    # Four candidate segments per opening, in row order:
+    # left (full height), right (full height), lintel above, sill wall below
+    along = np.stack([op_left, right_w, op_w, op_w], axis=1).ravel()
+    along_c = np.stack(
+        [op_left / 2, op_right + right_w / 2, op_center, op_center], axis=1
+    ).ravel()
+    up = np.stack([full_h, full_h, lintel_h, sill], axis=1).ravel()
+    up_c = np.stack(
+        [full_h / 2, full_h / 2, op_top + lintel_h / 2, sill / 2], axis=1
+    ).ravel()
+    keep = np.stack([
+        op_left > 0.01,
+        op_right < seg_len - 0.01,
+        op_top < wall_h - 0.01,
+        sill > 0.01,
+    ], axis=1).ravel()
+    seg_wall = np.repeat(idx, 4)[keep]
+
+    # Walls without openings are a single solid segment
+    solid = np.setdiff1d(np.arange(len(walls)), idx)
+    along = np.concatenate([along[keep], wall_len[solid]])
+    along_c = np.concatenate([along_c[keep], wall_len[solid] / 2])
+    up = np.concatenate([up[keep], np.full(len(solid), wall_h)])
+    up_c = np.concatenate([up_c[keep], np.full(len(solid), wall_h / 2)])
+    seg_wall = np.concatenate([seg_wall, solid])
+
+    order = np.argsort(seg_wall, kind="stable")
+    along, along_c, up, up_c, seg_wall = (
+        along[order], along_c[order], up[order], up_c[order], seg_wall[order]
+    )
+
+    # Along-wall size goes on X for X walls and on Y for Y walls
+    on_x = along_x[seg_wall] > 0
+    thick = np.full_like(along, wall_t)
+    extents = np.column_stack([
+        np.where(on_x, along, thick), np.where(on_x, thick, along), up
+    ])
+    centers = np.column_stack([
+        origin_x[seg_wall] + np.where(on_x, along_c, thick / 2),
+        origin_y[seg_wall] + np.where(on_x, thick / 2, along_c),
+        up_c,
+    ])
+    return extents, centers
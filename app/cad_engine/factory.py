@@ -38,6 +38,9 @@ class CADFactory:
         "l_shape": "box",        # Fallback L-shape to box for now
     }
 
+    # Flat name/alias -> class table; rebuilt whenever the registry changes
+    _dispatch: dict[str, type[CADObject]] = {}
+
     @classmethod
     def create_cad_object(cls, params: dict) -> CADObject:
         """
@@ -46,24 +49,32 @@ class CADFactory:
         """
         shape_type = params.get("shape_type", "box").lower().strip()
 
-        # Check alias first
-        if shape_type in cls._aliases:
-            shape_type = cls._aliases[shape_type]
-
-        # Check registry
-        if shape_type not in cls._registry:
+        # Single lookup: aliases are already resolved in the dispatch table
+        shape_class = cls._dispatch.get(shape_type)
+        if shape_class is None:
             print(f"Warning: Unknown shape '{shape_type}', falling back to BoxShape.")
-            shape_type = "box"
+            shape_class = cls._registry["box"]
 
-        shape_class = cls._registry[shape_type]
         return shape_class(params)
 
     @classmethod
     def register_shape(cls, name: str, shape_class: type[CADObject]):
         """Register a new shape type dynamically."""
         cls._registry[name.lower()] = shape_class
+        cls._rebuild_dispatch()
+
+    @classmethod
+    def _rebuild_dispatch(cls):
+        """Merge registry and aliases into _dispatch (aliases take precedence)."""
+        dispatch = dict(cls._registry)
+        for alias, target in cls._aliases.items():
+            dispatch[alias] = cls._registry[target]
+        cls._dispatch = dispatch
 
     @classmethod
     def get_available_shapes(cls) -> list[str]:
         """Return list of registered shape type names."""
         return list(cls._registry.keys())
+
+
+CADFactory._rebuild_dispatch()
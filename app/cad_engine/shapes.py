@@ -1,5 +1,5 @@
 """Basic CAD shapes: Box and Cylinder."""
-from app.cad_engine.base import CADObject
+from app.cad_engine.base import CADObject, _CL, _FRONT, _SIDE, _TOP
 
 
 class BoxShape(CADObject):
@@ -11,64 +11,58 @@ class BoxShape(CADObject):
     """
 
     def draw_top_view(self):
-        width = self.params.get("width", 100)
-        length = self.params.get("length", 100)
+        p = self.params
+        width = p.get("width", 100)
+        length = p.get("length", 100)
+        dim = self.add_dimension_line
 
         # Title
         self.add_title("TAMPAK ATAS", (0, length + 15))
 
         # Draw rectangle
-        points = [
-            (0, 0), (width, 0), (width, length), (0, length)
-        ]
-        self.msp.add_lwpolyline(points, close=True, dxfattribs={"layer": "TOP_VIEW"})
+        self._add_rect(0, 0, width, length, _TOP)
 
         # Dimensions
-        self.add_dimension_line((0, 0), (width, 0), offset=15)
-        self.add_dimension_line((width, 0), (width, length), offset=-15)
+        dim((0, 0), (width, 0), offset=15)
+        dim((width, 0), (width, length), offset=-15)
 
     def draw_front_view(self):
-        width = self.params.get("width", 100)
-        height = self.params.get("height", 50)
+        p = self.params
+        width = p.get("width", 100)
+        height = p.get("height", 50)
         offset_y = self.VIEW_GAP
+        top_y = offset_y + height
+        dim = self.add_dimension_line
 
         # Title
-        self.add_title("TAMPAK DEPAN", (0, offset_y + height + 15))
+        self.add_title("TAMPAK DEPAN", (0, top_y + 15))
 
         # Draw rectangle
-        points = [
-            (0, offset_y),
-            (width, offset_y),
-            (width, offset_y + height),
-            (0, offset_y + height)
-        ]
-        self.msp.add_lwpolyline(points, close=True, dxfattribs={"layer": "FRONT_VIEW"})
+        self._add_rect(0, offset_y, width, height, _FRONT)
 
         # Dimensions
-        self.add_dimension_line((0, offset_y), (width, offset_y), offset=15)
-        self.add_dimension_line((0, offset_y), (0, offset_y + height), offset=15)
+        dim((0, offset_y), (width, offset_y), offset=15)
+        dim((0, offset_y), (0, top_y), offset=15)
 
     def draw_side_view(self):
-        length = self.params.get("length", 100)
-        height = self.params.get("height", 50)
+        p = self.params
+        length = p.get("length", 100)
+        height = p.get("height", 50)
         offset_x = self.SIDE_GAP
         offset_y = self.VIEW_GAP
+        right_x = offset_x + length
+        top_y = offset_y + height
+        dim = self.add_dimension_line
 
         # Title
-        self.add_title("TAMPAK SAMPING", (offset_x, offset_y + height + 15))
+        self.add_title("TAMPAK SAMPING", (offset_x, top_y + 15))
 
         # Side view = length x height
-        points = [
-            (offset_x, offset_y),
-            (offset_x + length, offset_y),
-            (offset_x + length, offset_y + height),
-            (offset_x, offset_y + height)
-        ]
-        self.msp.add_lwpolyline(points, close=True, dxfattribs={"layer": "SIDE_VIEW"})
+        self._add_rect(offset_x, offset_y, length, height, _SIDE)
 
         # Dimensions
-        self.add_dimension_line((offset_x, offset_y), (offset_x + length, offset_y), offset=15)
-        self.add_dimension_line((offset_x + length, offset_y), (offset_x + length, offset_y + height), offset=-15)
+        dim((offset_x, offset_y), (right_x, offset_y), offset=15)
+        dim((right_x, offset_y), (right_x, top_y), offset=-15)
 
 
 class CylinderShape(CADObject):
@@ -87,68 +81,53 @@ class CylinderShape(CADObject):
         self.add_title("TAMPAK ATAS", (0, diameter + 15))
 
         # Circle centered in bounding box
-        self.msp.add_circle(
-            (radius, radius), radius,
-            dxfattribs={"layer": "TOP_VIEW"}
-        )
+        msp = self.msp
+        msp.add_circle((radius, radius), radius, dxfattribs=_TOP)
 
         # Center crosshair
-        self.msp.add_line(
-            (radius - radius * 0.3, radius), (radius + radius * 0.3, radius),
-            dxfattribs={"layer": "CENTER_LINES"}
-        )
-        self.msp.add_line(
-            (radius, radius - radius * 0.3), (radius, radius + radius * 0.3),
-            dxfattribs={"layer": "CENTER_LINES"}
-        )
+        arm = radius * 0.3
+        msp.add_line((radius - arm, radius), (radius + arm, radius), dxfattribs=_CL)
+        msp.add_line((radius, radius - arm), (radius, radius + arm), dxfattribs=_CL)
 
     def draw_front_view(self):
-        diameter = self.params.get("diameter", 100)
-        height = self.params.get("height", 100)
+        p = self.params
+        diameter = p.get("diameter", 100)
+        height = p.get("height", 100)
         offset_y = self.VIEW_GAP
+        top_y = offset_y + height
+        dim = self.add_dimension_line
 
         # Title
-        self.add_title("TAMPAK DEPAN", (0, offset_y + height + 15))
+        self.add_title("TAMPAK DEPAN", (0, top_y + 15))
 
         # Front view of cylinder is a rectangle
-        points = [
-            (0, offset_y),
-            (diameter, offset_y),
-            (diameter, offset_y + height),
-            (0, offset_y + height)
-        ]
-        self.msp.add_lwpolyline(points, close=True, dxfattribs={"layer": "FRONT_VIEW"})
+        self._add_rect(0, offset_y, diameter, height, _FRONT)
 
         # Dimensions
-        self.add_dimension_line((0, offset_y), (diameter, offset_y), offset=15)
-        self.add_dimension_line((0, offset_y), (0, offset_y + height), offset=15)
+        dim((0, offset_y), (diameter, offset_y), offset=15)
+        dim((0, offset_y), (0, top_y), offset=15)
 
     def draw_side_view(self):
-        diameter = self.params.get("diameter", 100)
-        height = self.params.get("height", 100)
+        p = self.params
+        diameter = p.get("diameter", 100)
+        height = p.get("height", 100)
         offset_x = self.SIDE_GAP
         offset_y = self.VIEW_GAP
+        right_x = offset_x + diameter
+        top_y = offset_y + height
+        dim = self.add_dimension_line
 
         # Title
-        self.add_title("TAMPAK SAMPING", (offset_x, offset_y + height + 15))
+        self.add_title("TAMPAK SAMPING", (offset_x, top_y + 15))
 
         # Side view of cylinder is identical to front (symmetric)
-        points = [
-            (offset_x, offset_y),
-            (offset_x + diameter, offset_y),
-            (offset_x + diameter, offset_y + height),
-            (offset_x, offset_y + height)
-        ]
-        self.msp.add_lwpolyline(points, close=True, dxfattribs={"layer": "SIDE_VIEW"})
+        self._add_rect(offset_x, offset_y, diameter, height, _SIDE)
 
         # Center line (dashed vertical)
         center_x = offset_x + diameter / 2
-        self.msp.add_line(
-            (center_x, offset_y - 5), (center_x, offset_y + height + 5),
-            dxfattribs={"layer": "CENTER_LINES"}
-        )
+        self.msp.add_line((center_x, offset_y - 5), (center_x, top_y + 5), dxfattribs=_CL)
 
         # Dimensions
-        self.add_dimension_line((offset_x, offset_y), (offset_x + diameter, offset_y), offset=15)
-        self.add_dimension_line((offset_x + diameter, offset_y), (offset_x + diameter, offset_y + height), offset=-15)
+        dim((offset_x, offset_y), (right_x, offset_y), offset=15)
+        dim((right_x, offset_y), (right_x, top_y), offset=-15)
 
@@ -1,6 +1,28 @@
 """SVG Exporter — Convert DXF entities to SVG for browser preview."""
+import io
 import ezdxf
 import math
+import numpy as np
+
+# XML escapes for TEXT content, applied in one C-level pass
+_ESC = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+# SVG element templates, bound once at import so the hot loop is a single call
+# Polyline vertex: an (x, y) tuple is %-formatted as-is, so it can be map()ped
+_PT_FMT = "%.1f,%.1f".__mod__
+_POLYGON_TMPL = '<polygon points="{}"/>\n'.format
+_POLY_TMPL = '<polyline points="{}"/>\n'.format
+_LINE_TMPL = '<line x1="{:.1f}" y1="{:.1f}" x2="{:.1f}" y2="{:.1f}"/>\n'.format
+_CIRCLE_TMPL = '<circle cx="{:.1f}" cy="{:.1f}" r="{:.1f}"/>\n'.format
+_ARC_TMPL = '<path d="M {:.1f} {:.1f} A {r:.1f} {r:.1f} 0 {} {} {:.1f} {:.1f}"/>\n'.format
+# Text sits inside a stroked layer group, so it opts out of the stroke
+_TEXT_TMPL = (
+    '<g transform="translate({:.1f},{:.1f}) scale(1,-1)">'
+    '<text font-size="{:.1f}" fill="{}" stroke="none" font-family="monospace">{}</text>'
+    '</g>\n'
+).format
+# Stroke style is set once per run of same-layer elements
+_GROUP_TMPL = '<g fill="none" stroke="{}" stroke-width="{}">\n'.format
 
 
 def dxf_to_svg(filepath: str, width: int = 800, height: int = 600) -> str:
@@ -9,53 +31,68 @@ def dxf_to_svg(filepath: str, width: int = 800, height: int = 600) -> str:
     suitable for embedding in HTML. Auto-scales to fit viewport.
     """
     doc = ezdxf.readfile(filepath)
-    msp = doc.modelspace()
+    return modelspace_to_svg(doc.modelspace(), width, height)
 
-    # Collect all coordinate points to determine bounds
-    all_points = []
+
+def modelspace_to_svg(msp, width: int = 800, height: int = 600) -> str:
+    """
+    Convert the entities of an ezdxf layout to an SVG string.
+    Works on an in-memory modelspace, so no DXF write/read is needed.
+    """
+    # Collect entities and track the drawing bounds in the same pass
+    inf = math.inf
+    min_x = min_y = inf
+    max_x = max_y = -inf
     entities_data = []
+    arcs = []  # (cx, cy, r, start_deg, end_deg); endpoints are computed in one batch
 
     for entity in msp:
-        if entity.dxftype() == "LWPOLYLINE":
+        etype = entity.dxftype()
+        if etype == "LWPOLYLINE":
             points = list(entity.get_points(format="xy"))
-            all_points.extend(points)
-            is_closed = entity.close
+            if points:
+                pxs = [p[0] for p in points]
+                pys = [p[1] for p in points]
+                min_x = min(min_x, min(pxs))
+                max_x = max(max_x, max(pxs))
+                min_y = min(min_y, min(pys))
+                max_y = max(max_y, max(pys))
+            is_closed = entity.closed
             entities_data.append(("polyline", points, is_closed, entity.dxf.layer))
 
-        elif entity.dxftype() == "LINE":
+        elif etype == "LINE":
             start = (entity.dxf.start.x, entity.dxf.start.y)
             end = (entity.dxf.end.x, entity.dxf.end.y)
-            all_points.extend([start, end])
+            min_x = min(min_x, start[0], end[0])
+            max_x = max(max_x, start[0], end[0])
+            min_y = min(min_y, start[1], end[1])
+            max_y = max(max_y, start[1], end[1])
             entities_data.append(("line", [start, end], False, entity.dxf.layer))
 
-        elif entity.dxftype() == "CIRCLE":
+        elif etype == "CIRCLE" or etype == "ARC":
             cx, cy = entity.dxf.center.x, entity.dxf.center.y
             r = entity.dxf.radius
-            all_points.extend([(cx - r, cy - r), (cx + r, cy + r)])
-            entities_data.append(("circle", (cx, cy, r), False, entity.dxf.layer))
-
-        elif entity.dxftype() == "ARC":
-            cx, cy = entity.dxf.center.x, entity.dxf.center.y
-            r = entity.dxf.radius
-            all_points.extend([(cx - r, cy - r), (cx + r, cy + r)])
-            start_angle = math.radians(entity.dxf.start_angle)
-            end_angle = math.radians(entity.dxf.end_angle)
-            entities_data.append(("arc", (cx, cy, r, start_angle, end_angle), False, entity.dxf.layer))
-
-        elif entity.dxftype() == "TEXT":
+            min_x = min(min_x, cx - r)
+            max_x = max(max_x, cx + r)
+            min_y = min(min_y, cy - r)
+            max_y = max(max_y, cy + r)
+            if etype == "CIRCLE":
+                entities_data.append(("circle", (cx, cy, r), False, entity.dxf.layer))
+            else:
+                arcs.append((cx, cy, r, entity.dxf.start_angle, entity.dxf.end_angle))
+                entities_data.append(("arc", len(arcs) - 1, False, entity.dxf.layer))
+
+        elif etype == "TEXT":
             ix, iy = entity.dxf.insert.x, entity.dxf.insert.y
-            all_points.append((ix, iy))
+            min_x = min(min_x, ix)
+            max_x = max(max_x, ix)
+            min_y = min(min_y, iy)
+            max_y = max(max_y, iy)
             entities_data.append(("text", (ix, iy, entity.dxf.text, entity.dxf.height), False, entity.dxf.layer))
 
-    if not all_points:
+    if min_x == inf:
         return '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100"><text x="10" y="50" fill="#999">No preview</text></svg>'
 
-    # Calculate bounds
-    xs = [p[0] for p in all_points]
-    ys = [p[1] for p in all_points]
-    min_x, max_x = min(xs), max(xs)
-    min_y, max_y = min(ys), max(ys)
-
     data_w = max_x - min_x or 1
     data_h = max_y - min_y or 1
     padding = max(data_w, data_h) * 0.1
@@ -65,6 +102,8 @@ def dxf_to_svg(filepath: str, width: int = 800, height: int = 600) -> str:
     vb_w = data_w + padding * 2
     vb_h = data_h + padding * 2
 
+    arc_paths = _arc_path_params(arcs) if arcs else []
+
     # Layer colors
     layer_colors = {
         "TOP_VIEW": "#e2e8f0",
@@ -76,65 +115,71 @@ def dxf_to_svg(filepath: str, width: int = 800, height: int = 600) -> str:
     }
     default_color = "#cbd5e1"
 
-    # Build SVG
-    svg_parts = [
-        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{vb_x:.1f} {vb_y:.1f} {vb_w:.1f} {vb_h:.1f}" ',
-        f'width="{width}" height="{height}" style="background:#0f172a;border-radius:12px;">',
-    ]
+    # Build SVG into a single buffer; fragments are newline-terminated
+    buf = io.StringIO()
+    w = buf.write
+    w(f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{vb_x:.1f} {vb_y:.1f} {vb_w:.1f} {vb_h:.1f}" \n')
+    w(f'width="{width}" height="{height}" style="background:#0f172a;border-radius:12px;">\n')
 
     # Flip Y axis (DXF Y goes up, SVG Y goes down)
-    svg_parts.append(f'<g transform="translate(0, {min_y + max_y}) scale(1, -1)">')
+    w(f'<g transform="translate(0, {min_y + max_y}) scale(1, -1)">\n')
+
+    # Consecutive entities on the same layer share one styled <g>; draw
+    # order is kept, so a layer may open several groups
+    current_layer = None
 
     for etype, data, closed, layer in entities_data:
-        color = layer_colors.get(layer, default_color)
-        stroke_w = 0.5 if layer == "DIMENSIONS" else 1
+        if layer != current_layer:
+            if current_layer is not None:
+                w('</g>\n')
+            color = layer_colors.get(layer, default_color)
+            w(_GROUP_TMPL(color, 0.5 if layer == "DIMENSIONS" else 1))
+            current_layer = layer
 
         if etype == "polyline":
-            pts_str = " ".join(f"{x:.1f},{y:.1f}" for x, y in data)
-            tag = "polygon" if closed else "polyline"
-            fill = "none"
-            svg_parts.append(
-                f'<{tag} points="{pts_str}" fill="{fill}" stroke="{color}" stroke-width="{stroke_w}"/>'
-            )
+            pts_str = " ".join(map(_PT_FMT, data))
+            tmpl = _POLYGON_TMPL if closed else _POLY_TMPL
+            w(tmpl(pts_str))
 
         elif etype == "line":
             (x1, y1), (x2, y2) = data
-            svg_parts.append(
-                f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}" '
-                f'stroke="{color}" stroke-width="{stroke_w}"/>'
-            )
+            w(_LINE_TMPL(x1, y1, x2, y2))
 
         elif etype == "circle":
             cx, cy, r = data
-            svg_parts.append(
-                f'<circle cx="{cx:.1f}" cy="{cy:.1f}" r="{r:.1f}" '
-                f'fill="none" stroke="{color}" stroke-width="{stroke_w}"/>'
-            )
+            w(_CIRCLE_TMPL(cx, cy, r))
 
         elif etype == "arc":
-            cx, cy, r, sa, ea = data
-            x1 = cx + r * math.cos(sa)
-            y1 = cy + r * math.sin(sa)
-            x2 = cx + r * math.cos(ea)
-            y2 = cy + r * math.sin(ea)
-            sweep = 1 if ea > sa else 0
-            large = 1 if abs(ea - sa) > math.pi else 0
-            svg_parts.append(
-                f'<path d="M {x1:.1f} {y1:.1f} A {r:.1f} {r:.1f} 0 {large} {sweep} {x2:.1f} {y2:.1f}" '
-                f'fill="none" stroke="{color}" stroke-width="{stroke_w}"/>'
-            )
+            x1, y1, large, sweep, x2, y2, r = arc_paths[data]
+            w(_ARC_TMPL(x1, y1, large, sweep, x2, y2, r=r))
 
         elif etype == "text":
             tx, ty, text_content, text_h = data
             font_size = max(text_h * 0.8, 3)
             # Text needs inverse flip to be readable
-            svg_parts.append(
-                f'<g transform="translate({tx:.1f},{ty:.1f}) scale(1,-1)">'
-                f'<text font-size="{font_size:.1f}" fill="{color}" font-family="monospace">{text_content}</text>'
-                f'</g>'
-            )
+            w(_TEXT_TMPL(tx, ty, font_size, color, text_content.translate(_ESC)))
+
+    if current_layer is not None:
+        w('</g>\n')
+    w('</g>\n</svg>')
 
-    svg_parts.append('</g>')
-    svg_parts.append('</svg>')
+    return buf.getvalue()
 
-    return "\n".join(svg_parts)
+
+def _arc_path_params(arcs: list) -> list:
+    """
+    Vectorized SVG arc parameters for (cx, cy, r, start_deg, end_deg) rows.
+    Returns (x1, y1, large, sweep, x2, y2, r) per arc, in input order.
+    """
+    cx, cy, r, sa, ea = np.array(arcs, dtype=np.float64).T
+    sa = np.radians(sa)
+    ea = np.radians(ea)
+    x1 = cx + r * np.cos(sa)
+    y1 = cy + r * np.sin(sa)
+    x2 = cx + r * np.cos(ea)
+    y2 = cy + r * np.sin(ea)
+    sweep = (ea > sa).astype(np.int64)
+    large = (np.abs(ea - sa) > math.pi).astype(np.int64)
+    # Per-column tolist() keeps the flags as ints ("1", not "1.0") in the output
+    return list(zip(x1.tolist(), y1.tolist(), large.tolist(), sweep.tolist(),
+                    x2.tolist(), y2.tolist(), r.tolist()))
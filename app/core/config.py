@@ -14,6 +14,8 @@ class Settings:
     VERSION = "1.0.0"
     GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
     OUTPUT_DIR: str = "/tmp/outputs" if IS_VERCEL else "outputs"
+    # Server-side state; kept out of OUTPUT_DIR, which is publicly downloadable
+    CACHE_DIR: str = "/tmp/cache" if IS_VERCEL else "cache"
 
     # AI Model Configuration
     LLM_MODEL = "llama-3.3-70b-versatile"
@@ -28,3 +30,4 @@ class Settings:
 
 settings = Settings()
 os.makedirs(settings.OUTPUT_DIR, exist_ok=True)
+os.makedirs(settings.CACHE_DIR, exist_ok=True)
@@ -1,5 +1,5 @@
 """Pydantic schemas for request/response validation."""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError, ValidationInfo, field_validator
 from typing import Optional
 
 
@@ -16,14 +16,30 @@ class WindowSpec(BaseModel):
 class CADParameters(BaseModel):
     """Parameters extracted by LLM from user prompt."""
     shape_type: str = Field(default="box", description="Shape type: box|cylinder|chair|room|l_shape")
-    width: float = Field(default=100, description="Width in cm")
-    length: float = Field(default=100, description="Length in cm")
-    height: float = Field(default=50, description="Height in cm")
+    width: Optional[float] = Field(default=100, description="Width in cm")
+    length: Optional[float] = Field(default=100, description="Length in cm")
+    height: Optional[float] = Field(default=50, description="Height in cm")
     diameter: Optional[float] = Field(default=None, description="Diameter in cm (for cylinder)")
     legs: Optional[int] = Field(default=None, description="Number of legs (for chair)")
     doors: Optional[list[DoorSpec]] = Field(default=None, description="Door specifications")
     windows: Optional[list[WindowSpec]] = Field(default=None, description="Window specifications")
-    description: str = Field(default="", description="Brief description of the object")
+    description: Optional[str] = Field(default="", description="Brief description of the object")
+
+    @field_validator("doors", "windows", mode="before")
+    @classmethod
+    def _drop_invalid_openings(cls, value, info: ValidationInfo):
+        """Skip malformed door/window entries instead of rejecting the whole reply."""
+        if not isinstance(value, list):
+            return value
+        spec = DoorSpec if info.field_name == "doors" else WindowSpec
+        kept = []
+        for item in value:
+            try:
+                spec.model_validate(item)
+            except ValidationError:
+                continue
+            kept.append(item)
+        return kept
 
 
 class GenerateResponse(BaseModel):
@@ -1,4 +1,5 @@
 """Audio Service — Speech to Text via Whisper Large v3 Turbo."""
+import asyncio
 from app.core.llm_client import get_groq_client
 from app.core.config import settings
 
@@ -13,7 +14,10 @@ class AudioService:
         Returns dict with text, language, duration, and segments.
         """
         try:
-            transcription = self.client.audio.transcriptions.create(
+            # The Groq client is blocking; run it in a thread so other
+            # coroutines (e.g. the vision call) keep making progress
+            transcription = await asyncio.to_thread(
+                self.client.audio.transcriptions.create,
                 file=(filename, file_content),
                 model=settings.STT_MODEL,
                 temperature=0,
@@ -35,3 +39,6 @@ class AudioService:
                 "duration": None,
                 "segments": [],
             }
+
+
+audio_service = AudioService()
@@ -1,18 +1,59 @@
 """Reasoning Service — Text to CAD Parameters via Llama 3.3 70B (streaming)."""
-import json
+import asyncio
+import copy
+import hashlib
+import orjson
+import os
+import threading
+from collections import OrderedDict
+from pydantic import ValidationError
 from app.core.llm_client import get_groq_client
 from app.core.config import settings
+from app.models.schemas import CADParameters
+
+# Max prompts kept in the exact-match parameter cache
+_PROMPT_CACHE_SIZE = 256
 
 
 class ReasoningService:
     def __init__(self):
         self.client = get_groq_client()
+        # normalized-prompt digest -> params dict (LRU order)
+        self._cache: OrderedDict[str, dict] = OrderedDict()
+        # extract_cad_parameters runs in worker threads; guards _cache
+        self._cache_lock = threading.Lock()
+        # normalized-prompt digest -> LLM call currently in progress
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def extract_cad_parameters_async(self, user_prompt: str) -> dict:
+        """
+        Non-blocking extract_cad_parameters for async endpoints.
+        The LLM call runs in a worker thread, and concurrent requests
+        with the same prompt await a single shared call.
+        """
+        key = self._cache_key(user_prompt)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(asyncio.to_thread(self.extract_cad_parameters, user_prompt))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: one caller disconnecting must not cancel the others' call
+        return copy.deepcopy(await asyncio.shield(task))
 
     def extract_cad_parameters(self, user_prompt: str) -> dict:
         """
         Convert natural language description to JSON CAD parameters
         using Llama 3.3 70B with streaming response.
+        Repeated prompts (case/whitespace-insensitive) are answered from
+        cache; LLM failures are never cached.
         """
+        key = self._cache_key(user_prompt)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return copy.deepcopy(cached)
+
         system_prompt = """
         Anda adalah Senior CAD Engineer. Tugas anda adalah mengekstrak parameter geometri dari input user.
         Output WAJIB JSON valid tanpa markdown.
@@ -62,21 +103,73 @@ class ReasoningService:
                 response_format={"type": "json_object"}
             )
 
-            # Collect streaming chunks into full response
-            full_response = ""
+            # Collect streaming chunks as UTF-8 bytes; parsed once at the end
+            full_response = bytearray()
             for chunk in completion:
                 content = chunk.choices[0].delta.content or ""
-                full_response += content
+                full_response += content.encode()
 
-            return json.loads(full_response)
+            # Parse + validate in one pass (pydantic-core). Only fields the
+            # model actually returned with a value are kept, so shape
+            # defaults still apply to omitted or null ones.
+            params = CADParameters.model_validate_json(bytes(full_response))
+            result = params.model_dump(exclude_unset=True, exclude_none=True)
+            self._remember(key, result)
+            return result
 
-        except json.JSONDecodeError as e:
-            print(f"JSON Parse Error: {e}, raw: {full_response[:200]}")
+        except ValidationError as e:
+            raw = full_response[:200].decode(errors="replace")
+            print(f"JSON Parse Error: {e}, raw: {raw}")
             return self._fallback_params()
         except Exception as e:
             print(f"LLM Error: {e}")
             return self._fallback_params()
 
+    @staticmethod
+    def _cache_key(prompt: str) -> str:
+        """Digest of the prompt with case and whitespace normalized."""
+        normalized = " ".join(prompt.lower().split())
+        return hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+
+    def _remember(self, key: str, params: dict):
+        """Store a copy of params, evicting the least recently used entry."""
+        params = copy.deepcopy(params)
+        with self._cache_lock:
+            self._cache[key] = params
+            self._cache.move_to_end(key)
+            if len(self._cache) > _PROMPT_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def load_cache(self, path: str | os.PathLike):
+        """Warm the prompt cache from a JSON file written by save_cache()."""
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "rb") as f:
+                entries = orjson.loads(f.read())
+            with self._cache_lock:
+                for key, params in entries[-_PROMPT_CACHE_SIZE:]:
+                    if isinstance(key, str) and isinstance(params, dict):
+                        self._cache[key] = params
+        except (OSError, ValueError, TypeError) as e:
+            print(f"Prompt cache load error: {e}")
+
+    def save_cache(self, path: str | os.PathLike):
+        """
+        Persist the prompt cache (oldest first) as JSON.
+        Written to a temp file and swapped in, so workers saving at the same
+        time never leave a half-written file (the last one to finish wins).
+        """
+        with self._cache_lock:
+            entries = list(self._cache.items())
+        tmp_path = f"{os.fspath(path)}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(orjson.dumps(entries))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Prompt cache save error: {e}")
+
     @staticmethod
     def _fallback_params() -> dict:
         """Return safe default parameters when LLM fails."""
@@ -87,3 +180,6 @@ class ReasoningService:
             "height": 50,
             "description": "Default box (LLM fallback)"
         }
+
+
+reasoning_service = ReasoningService()
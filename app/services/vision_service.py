@@ -1,8 +1,49 @@
 """Vision Service — Image Analysis via Llama 4 Scout 17B (Multimodal)."""
-import base64
+import threading
+from collections import OrderedDict
+import pybase64
+import xxhash
 from app.core.llm_client import get_groq_client
 from app.core.config import settings
 
+# LRU of encoded data URLs, keyed by a fast non-cryptographic hash of the image.
+# Uploads are not size-limited server-side, so the cache is bounded by the
+# total length of the URLs it holds as well as by entry count
+_DATA_URL_CACHE_SIZE = 32
+_DATA_URL_CACHE_BYTES = 32 * 1024 * 1024
+_data_url_cache: OrderedDict[tuple, str] = OrderedDict()
+_data_url_cache_bytes = 0
+# analyze_sketch runs in worker threads; guards _data_url_cache
+_data_url_lock = threading.Lock()
+
+
+def _image_data_url(image_bytes: bytes, mime_type: str) -> str:
+    """Return the base64 data URL for an image, reusing it for resubmitted images."""
+    global _data_url_cache_bytes
+    key = (xxhash.xxh3_64_intdigest(image_bytes), len(image_bytes), mime_type)
+    with _data_url_lock:
+        url = _data_url_cache.get(key)
+        if url is not None:
+            _data_url_cache.move_to_end(key)
+            return url
+
+    # Encode outside the lock so large images don't serialize other requests
+    b64_image = pybase64.b64encode(image_bytes).decode("ascii")
+    url = f"data:{mime_type};base64,{b64_image}"
+    if len(url) > _DATA_URL_CACHE_BYTES:
+        return url
+    with _data_url_lock:
+        old = _data_url_cache.pop(key, None)
+        if old is not None:
+            _data_url_cache_bytes -= len(old)
+        _data_url_cache[key] = url
+        _data_url_cache_bytes += len(url)
+        while (len(_data_url_cache) > _DATA_URL_CACHE_SIZE
+               or _data_url_cache_bytes > _DATA_URL_CACHE_BYTES):
+            _, evicted = _data_url_cache.popitem(last=False)
+            _data_url_cache_bytes -= len(evicted)
+    return url
+
 
 class VisionService:
     def __init__(self):
@@ -13,9 +54,8 @@ class VisionService:
         Analyze an image/sketch using Llama 4 Scout 17B multimodal model.
         Returns a text description suitable for CAD parameter extraction.
         """
-        # Encode image to base64 data URL
-        b64_image = base64.b64encode(image_bytes).decode("utf-8")
-        image_data_url = f"data:{mime_type};base64,{b64_image}"
+        # Encode image to base64 data URL (cached per image)
+        image_data_url = _image_data_url(image_bytes, mime_type)
 
         analysis_prompt = (
             "Analisa gambar/sketsa teknis berikut. "
@@ -53,14 +93,17 @@ class VisionService:
                 stop=None
             )
 
-            # Collect streaming chunks
-            full_response = ""
+            # Collect streaming chunks as UTF-8 bytes, decode once
+            full_response = bytearray()
             for chunk in completion:
                 content = chunk.choices[0].delta.content or ""
-                full_response += content
+                full_response += content.encode()
 
-            return full_response
+            return full_response.decode()
 
         except Exception as e:
             print(f"Vision Error: {e}")
             return ""
+
+
+vision_service = VisionService()
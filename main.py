@@ -2,32 +2,206 @@
 from fastapi import FastAPI, Request, UploadFile, File, Form
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
+import asyncio
+import concurrent.futures
+import hashlib
+import multiprocessing
 import os
 import uuid
+import orjson
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from pathlib import Path
 
-from app.core.config import settings
-from app.services.reasoning_service import ReasoningService
-from app.services.audio_service import AudioService
-from app.services.vision_service import VisionService
-from app.cad_engine.factory import CADFactory
-from app.cad_engine.svg_exporter import dxf_to_svg
-from app.cad_engine.exporter_3d import export_3d_stl
+from app.core.config import settings, IS_VERCEL
+from app.models.schemas import GenerateResponse
+from app.services.reasoning_service import reasoning_service
+from app.services.audio_service import audio_service
+from app.services.vision_service import vision_service
 
 
-app = FastAPI(title=settings.PROJECT_NAME, version=settings.VERSION)
+# Generated artifacts live here; resolved once instead of per request
+OUTPUT_DIR = Path(settings.OUTPUT_DIR)
+
+# Prompt -> params cache survives restarts via this file (not downloadable)
+PROMPT_CACHE_FILE = Path(settings.CACHE_DIR) / "param_cache.json"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the prompt cache on startup; persist it and stop the CAD pool on shutdown."""
+    reasoning_service.load_cache(PROMPT_CACHE_FILE)
+    yield
+    reasoning_service.save_cache(PROMPT_CACHE_FILE)
+    # Drop the pool too, so a later lifespan in this process starts a new one
+    if _executor is not None:
+        _discard_executor(_executor)
+
+
+app = FastAPI(
+    title=settings.PROJECT_NAME,
+    version=settings.VERSION,
+    lifespan=lifespan,
+)
 
 # Static files & templates
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
-# Initialize services
-reasoning_service = ReasoningService()
-audio_service = AudioService()
-vision_service = VisionService()
+# Params per generated DXF (keyed by DXF filename): a bounded in-process LRU
+# in front of a JSON sidecar next to the DXF, which every worker can read
+_PARAMS_CACHE_SIZE = 10_000
+_params_cache: OrderedDict[str, dict] = OrderedDict()
+
+
+def _params_sidecar(filename: str) -> Path:
+    """Path of the JSON file holding the params a DXF was generated from."""
+    return (OUTPUT_DIR / filename).with_suffix(".json")
+
+
+def _cache_params(filename: str, params: dict):
+    """Insert into the LRU, evicting the least recently used entry."""
+    _params_cache[filename] = params
+    _params_cache.move_to_end(filename)
+    if len(_params_cache) > _PARAMS_CACHE_SIZE:
+        _params_cache.popitem(last=False)
+
+
+def _write_params_sidecar(filename: str, params: dict):
+    """Persist params beside their DXF so any worker can export it later."""
+    try:
+        _params_sidecar(filename).write_bytes(orjson.dumps(params))
+    except OSError as e:
+        print(f"Params sidecar write error: {e}")
+
+
+def _lookup_params(filename: str) -> dict | None:
+    """Params for a generated DXF, from this worker's cache or the sidecar."""
+    params = _params_cache.get(filename)
+    if params is not None:
+        _params_cache.move_to_end(filename)
+        return params
+    try:
+        params = orjson.loads(_params_sidecar(filename).read_bytes())
+    except (OSError, ValueError):
+        return None
+    _cache_params(filename, params)
+    return params
+
+
+# Worker pool for CPU-bound CAD generation. Serverless (Vercel/Lambda) has
+# no /dev/shm for multiprocessing locks, so threads are used there instead.
+# Every uvicorn worker owns a pool, so each one stays small: a drawing takes
+# milliseconds and the web workers already spread load across the cores.
+_CAD_POOL_WORKERS = 2
+_executor: concurrent.futures.Executor | None = None
+
+
+def _get_executor() -> concurrent.futures.Executor:
+    """Create the CAD worker pool on first use."""
+    global _executor
+    if _executor is None:
+        if IS_VERCEL:
+            _executor = concurrent.futures.ThreadPoolExecutor(max_workers=_CAD_POOL_WORKERS)
+        else:
+            # The server already runs threads (anyio, httpx pool) by now, and
+            # forking a multi-threaded process can deadlock the child
+            _executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=_CAD_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+    return _executor
+
+
+def _discard_executor(executor: concurrent.futures.Executor):
+    """Drop a broken pool so the next _get_executor() starts a fresh one."""
+    global _executor
+    if _executor is executor:
+        _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _build_cad(params: dict, filepath: Path) -> str:
+    """
+    Draw all views, save the DXF and render its SVG preview.
+    Runs inside the worker pool; returns the SVG ("" if preview fails).
+    """
+    # Imported here so ezdxf only loads in processes that generate drawings
+    from app.cad_engine.factory import CADFactory
+
+    cad_object = CADFactory.create_cad_object(params)
+    cad_object.draw_all()
+    cad_object.save(filepath)
+
+    try:
+        return cad_object.render_svg()
+    except Exception as e:
+        print(f"SVG Preview Error: {e}")
+        return ""
+
 
-# In-memory cache for params (keyed by DXF filename)
-_params_cache: dict[str, dict] = {}
+# Generation is deterministic in params: identical params reuse the DXF bytes
+# and SVG preview of an earlier run (params hash -> (dxf_bytes, svg))
+_ARTIFACT_CACHE_SIZE = 256
+_artifact_cache: OrderedDict[str, tuple[bytes, str]] = OrderedDict()
+
+
+async def _generate_artifacts(params: dict, filepath: Path) -> str:
+    """Write the DXF for params to filepath and return its SVG preview."""
+    key = hashlib.sha1(orjson.dumps(params, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    cached = _artifact_cache.get(key)
+    if cached is not None:
+        _artifact_cache.move_to_end(key)
+        dxf_bytes, svg_preview = cached
+        await asyncio.to_thread(filepath.write_bytes, dxf_bytes)
+        return svg_preview
+
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    try:
+        svg_preview = await loop.run_in_executor(executor, _build_cad, params, filepath)
+    except concurrent.futures.BrokenExecutor:
+        # A crashed child breaks a process pool for good; replace it, retry once
+        _discard_executor(executor)
+        svg_preview = await loop.run_in_executor(_get_executor(), _build_cad, params, filepath)
+    # A failed preview is not cached so the next request retries it
+    if svg_preview:
+        dxf_bytes = await asyncio.to_thread(filepath.read_bytes)
+        _artifact_cache[key] = (dxf_bytes, svg_preview)
+        if len(_artifact_cache) > _ARTIFACT_CACHE_SIZE:
+            _artifact_cache.popitem(last=False)
+    return svg_preview
+
+
+def _has_upload(upload: UploadFile | None) -> bool:
+    """True unless the upload is missing or known to be empty (size unknown counts as present)."""
+    return upload is not None and upload.size != 0
+
+
+async def _audio_to_text(audio_file: UploadFile) -> str:
+    """Transcribe an uploaded audio file ("" if empty or failed)."""
+    # Starlette has already received the whole body, so reading it is a copy
+    # from the spool; passing the SpooledTemporaryFile instead would make
+    # httpx call fileno() and roll small recordings over to disk
+    audio_content = await audio_file.read()
+    if not audio_content:
+        return ""
+    result = await audio_service.transcribe_audio(audio_content, audio_file.filename)
+    return result["text"]
+
+
+async def _image_to_text(image_file: UploadFile) -> str:
+    """Describe an uploaded sketch ("" if empty or failed)."""
+    image_content = await image_file.read()
+    if not image_content:
+        return ""
+    # analyze_sketch is a blocking client call, keep it off the event loop
+    return await asyncio.to_thread(
+        vision_service.analyze_sketch,
+        image_content,
+        mime_type=image_file.content_type or "image/jpeg"
+    )
 
 
 @app.get("/")
@@ -36,7 +210,7 @@ async def index(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
 
-@app.post("/api/generate")
+@app.post("/api/generate", response_model=GenerateResponse)
 async def generate_cad(
     text_prompt: str = Form(None),
     audio_file: UploadFile = File(None),
@@ -47,67 +221,58 @@ async def generate_cad(
     Accepts text, audio, and/or image input.
     Returns CAD parameters + DXF download URL + SVG preview.
     """
-    final_prompt = ""
-
-    # 1. Process Audio → Text (Whisper-large-v3-turbo)
-    if audio_file:
-        audio_content = await audio_file.read()
-        if audio_content:
-            result = await audio_service.transcribe_audio(audio_content, audio_file.filename)
-            if result["text"]:
-                final_prompt += f" {result['text']}"
-
-    # 2. Process Image → Text (Llama 4 Scout Vision)
-    if image_file:
-        image_content = await image_file.read()
-        if image_content:
-            description = vision_service.analyze_sketch(
-                image_content,
-                mime_type=image_file.content_type or "image/jpeg"
-            )
-            if description:
-                final_prompt += f" {description}"
+    has_audio = _has_upload(audio_file)
+    has_image = _has_upload(image_file)
+    if not text_prompt and not has_audio and not has_image:
+        return JSONResponse(
+            {"status": "error", "message": "Input kosong. Berikan teks, suara, atau gambar."},
+            status_code=400
+        )
+
+    parts: list[str] = []
+
+    # 1. Audio → Text (Whisper) and 2. Image → Text (Llama 4 Scout Vision)
+    # run concurrently; results keep the audio-then-image order
+    media_tasks = []
+    if has_audio:
+        media_tasks.append(_audio_to_text(audio_file))
+    if has_image:
+        media_tasks.append(_image_to_text(image_file))
+    parts.extend(await asyncio.gather(*media_tasks))
 
     # 3. Process Text (direct append)
     if text_prompt:
-        final_prompt += f" {text_prompt}"
+        parts.append(text_prompt)
 
-    if not final_prompt.strip():
+    final_prompt = " ".join(p for p in parts if p).strip()
+    if not final_prompt:
         return JSONResponse(
             {"status": "error", "message": "Input kosong. Berikan teks, suara, atau gambar."},
             status_code=400
         )
 
-    # 4. Reasoning → JSON Parameters (Llama 3.3 streaming)
-    params = reasoning_service.extract_cad_parameters(final_prompt.strip())
+    # 4. Reasoning → JSON Parameters (Llama 3.3 streaming; repeated or
+    #    concurrent identical prompts share one LLM call)
+    params = await reasoning_service.extract_cad_parameters_async(final_prompt)
 
-    # 5. CAD Generation (Factory Pattern)
+    # 5. CAD Generation (Factory Pattern) + 6. SVG Preview, in the worker
+    #    pool; repeated params reuse cached artifacts
     try:
-        cad_object = CADFactory.create_cad_object(params)
-        cad_object.draw_top_view()
-        cad_object.draw_front_view()
-        cad_object.draw_side_view()
+        filename = f"{uuid.uuid4().hex[:16]}.dxf"
+        filepath = OUTPUT_DIR / filename
+        svg_preview = await _generate_artifacts(params, filepath)
 
-        filename = f"{uuid.uuid4()}.dxf"
-        filepath = os.path.join(settings.OUTPUT_DIR, filename)
-        cad_object.save(filepath)
-
-        # Cache params for 3D export
-        _params_cache[filename] = params
-
-        # 6. Generate SVG Preview
-        svg_preview = ""
-        try:
-            svg_preview = dxf_to_svg(filepath)
-        except Exception as e:
-            print(f"SVG Preview Error: {e}")
+        # Cache params for 3D export; the sidecar is written before replying
+        # so an export request landing on another worker can always find it
+        _cache_params(filename, params)
+        await asyncio.to_thread(_write_params_sidecar, filename, params)
 
         return {
             "status": "success",
             "data": params,
             "download_url": f"/download/{filename}",
             "svg_preview": svg_preview,
-            "original_prompt": final_prompt.strip(),
+            "original_prompt": final_prompt,
         }
 
     except Exception as e:
@@ -117,27 +282,58 @@ async def generate_cad(
         )
 
 
+def _download_response(request: Request, filename: str, suffix: str, media_type: str):
+    """
+    Serve a generated file with a strong ETag; a matching If-None-Match
+    gets an empty 304 instead of the file body. Only files with the given
+    suffix are served, never the params sidecars or other output state.
+    """
+    filepath = OUTPUT_DIR / filename
+    st = None
+    if filepath.suffix == suffix:
+        try:
+            st = filepath.stat()
+        except FileNotFoundError:
+            pass
+    if st is None:
+        return JSONResponse({"status": "error", "message": "File not found"}, status_code=404)
+
+    digest = hashlib.sha1(f"{st.st_mtime_ns}-{st.st_size}".encode()).hexdigest()
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=3600"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match == "*" or etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(
+        filepath, filename=filename, media_type=media_type, headers=headers, stat_result=st
+    )
+
+
 @app.get("/download/{filename}")
-async def download_dxf(filename: str):
+async def download_dxf(request: Request, filename: str):
     """Download generated DXF file."""
-    filepath = os.path.join(settings.OUTPUT_DIR, filename)
-    if not os.path.exists(filepath):
-        return JSONResponse({"status": "error", "message": "File not found"}, status_code=404)
-    return FileResponse(filepath, filename=filename, media_type="application/dxf")
+    return _download_response(request, filename, ".dxf", "application/dxf")
 
 
 @app.post("/api/export-3d/{filename}")
 async def export_3d(filename: str):
     """Export a generated DXF to 3D STL format."""
-    dxf_path = os.path.join(settings.OUTPUT_DIR, filename)
-    if not os.path.exists(dxf_path):
+    # Imported here so workers that only serve downloads never load numpy/trimesh
+    from app.cad_engine.exporter_3d import export_3d_stl
+
+    if not filename.endswith(".dxf"):
+        return JSONResponse({"status": "error", "message": "DXF file not found"}, status_code=404)
+    try:
+        (OUTPUT_DIR / filename).stat()
+    except FileNotFoundError:
         return JSONResponse({"status": "error", "message": "DXF file not found"}, status_code=404)
 
-    stl_filename = filename.replace(".dxf", ".stl")
-    stl_path = os.path.join(settings.OUTPUT_DIR, stl_filename)
+    stl_filename = filename.removesuffix(".dxf") + ".stl"
+    stl_path = str(OUTPUT_DIR / stl_filename)
 
     # Retrieve cached params from generation
-    params = _params_cache.get(filename, {"shape_type": "box", "width": 100, "length": 100, "height": 50})
+    params = _lookup_params(filename) or {"shape_type": "box", "width": 100, "length": 100, "height": 50}
     success = export_3d_stl(params, stl_path)
 
     if success:
@@ -153,12 +349,9 @@ async def export_3d(filename: str):
 
 
 @app.get("/download-3d/{filename}")
-async def download_stl(filename: str):
+async def download_stl(request: Request, filename: str):
     """Download generated STL file."""
-    filepath = os.path.join(settings.OUTPUT_DIR, filename)
-    if not os.path.exists(filepath):
-        return JSONResponse({"status": "error", "message": "File not found"}, status_code=404)
-    return FileResponse(filepath, filename=filename, media_type="application/sla")
+    return _download_response(request, filename, ".stl", "application/sla")
 
 
 
@@ -166,4 +359,14 @@ async def download_stl(filename: str):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # "auto" picks uvloop + httptools when installed (uvicorn[standard], not
+    # on Windows) and falls back to asyncio/h11; one async worker per core
+    # (each with its own small CAD pool) unless WEB_CONCURRENCY overrides it
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",
+        http="auto",
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+    )
@@ -0,0 +1,26 @@
+"""Shared fixtures — a stand-in for the Groq client's streaming chat API."""
+from types import SimpleNamespace
+
+import pytest
+
+
+class StubCompletions:
+    """Stands in for client.chat.completions, streaming a fixed reply."""
+
+    def __init__(self, reply: str):
+        self.reply = reply
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        half = len(self.reply) // 2
+        for piece in (self.reply[:half], self.reply[half:], None):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+
+@pytest.fixture
+def stub_llm():
+    """Factory for a client whose chat.completions streams back the given reply."""
+    def make(reply: str):
+        return SimpleNamespace(chat=SimpleNamespace(completions=StubCompletions(reply)))
+    return make
@@ -0,0 +1,122 @@
+"""API tests for main.py routes — LLM stubbed, CAD built in a thread pool."""
+import concurrent.futures
+from collections import OrderedDict
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("groq")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+
+import main
+
+REPLY = '{"shape_type":"box","width":120,"length":60,"height":75,"description":"meja"}'
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, stub_llm):
+    """TestClient writing into tmp_path, with fresh caches and a stubbed LLM."""
+    monkeypatch.setattr(main, "OUTPUT_DIR", tmp_path)
+    monkeypatch.setattr(main, "IS_VERCEL", True)  # replacement pools use threads
+    monkeypatch.setattr(main, "_executor", concurrent.futures.ThreadPoolExecutor(1))
+    monkeypatch.setattr(main, "_artifact_cache", OrderedDict())
+    monkeypatch.setattr(main, "_params_cache", OrderedDict())
+    monkeypatch.setattr(main.reasoning_service, "_cache", OrderedDict())
+    monkeypatch.setattr(main.reasoning_service, "client", stub_llm(REPLY))
+    monkeypatch.setattr(main, "PROMPT_CACHE_FILE", tmp_path / "param_cache.json")
+    yield TestClient(main.app)
+    if main._executor is not None:
+        main._executor.shutdown()
+
+
+def _generate(client, prompt="meja 120x60"):
+    response = client.post("/api/generate", data={"text_prompt": prompt})
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestGenerate:
+    """Tests for /api/generate."""
+
+    def test_returns_drawing_and_preview(self, client):
+        body = _generate(client)
+        assert body["data"]["width"] == 120
+        assert body["svg_preview"].startswith("<svg")
+        assert (main.OUTPUT_DIR / body["download_url"].rsplit("/", 1)[1]).exists()
+
+    def test_blank_input_is_rejected_before_upload_io(self, client, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError("empty uploads must not be processed")
+        monkeypatch.setattr(main, "_audio_to_text", fail)
+        monkeypatch.setattr(main, "_image_to_text", fail)
+
+        response = client.post("/api/generate", files={
+            "audio_file": ("a.webm", b"", "audio/webm"),
+            "image_file": ("s.png", b"", "image/png"),
+        })
+        assert response.status_code == 400
+        assert response.json()["status"] == "error"
+
+    def test_identical_params_reuse_artifacts(self, client, monkeypatch):
+        builds = []
+        build_cad = main._build_cad
+        monkeypatch.setattr(main, "_build_cad", lambda *args: builds.append(args) or build_cad(*args))
+
+        first = _generate(client, "meja kerja")
+        second = _generate(client, "meja belajar")  # same params from the LLM
+
+        assert len(builds) == 1
+        assert second["svg_preview"] == first["svg_preview"]
+        assert second["download_url"] != first["download_url"]
+        first_dxf, second_dxf = (
+            main.OUTPUT_DIR / body["download_url"].rsplit("/", 1)[1] for body in (first, second)
+        )
+        assert second_dxf.read_bytes() == first_dxf.read_bytes()
+
+    def test_broken_pool_is_replaced(self, client, monkeypatch):
+        def crash():
+            raise RuntimeError("worker died")
+        broken = concurrent.futures.ThreadPoolExecutor(1, initializer=crash)
+        monkeypatch.setattr(main, "_executor", broken)
+
+        assert _generate(client)["svg_preview"].startswith("<svg")
+        assert main._executor is not broken
+
+    def test_generates_in_a_process_pool(self, client, monkeypatch):
+        monkeypatch.setattr(main, "IS_VERCEL", False)
+        monkeypatch.setattr(main, "_executor", None)
+
+        assert _generate(client)["svg_preview"].startswith("<svg")
+        assert isinstance(main._executor, concurrent.futures.ProcessPoolExecutor)
+
+    def test_pool_is_recreated_after_a_restart(self, client):
+        for _ in range(2):
+            with client:
+                assert _generate(client)["svg_preview"].startswith("<svg")
+            assert main._executor is None
+
+
+class TestDownload:
+    """Tests for the download routes."""
+
+    def test_unchanged_file_revalidates_with_304(self, client):
+        url = _generate(client)["download_url"]
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"].startswith("private")
+
+        cached = client.get(url, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+
+    def test_only_generated_drawings_are_served(self, client):
+        name = _generate(client)["download_url"].rsplit("/", 1)[1]
+        sidecar = name.removesuffix(".dxf") + ".json"
+        assert (main.OUTPUT_DIR / sidecar).exists()
+
+        assert client.get(f"/download/{sidecar}").status_code == 404
+        assert client.get(f"/download-3d/{name}").status_code == 404
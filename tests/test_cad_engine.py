@@ -1,6 +1,8 @@
 """Unit tests for CAD Engine — shapes, factory, and export."""
+import io
 import os
 import tempfile
+from xml.etree import ElementTree
 import pytest
 import ezdxf
 
@@ -8,6 +10,15 @@ from app.cad_engine.shapes import BoxShape, CylinderShape
 from app.cad_engine.advanced_shapes import ChairShape, RoomShape
 from app.cad_engine.factory import CADFactory
 from app.cad_engine.svg_exporter import dxf_to_svg
+from app.cad_engine.exporter_3d import export_3d_stl
+
+
+def _round_trip(shape):
+    """Serialize the shape's DXF and read it back, all in memory."""
+    buf = io.StringIO()
+    shape.doc.write(buf)
+    buf.seek(0)
+    return ezdxf.read(buf)
 
 
 class TestBoxShape:
@@ -19,14 +30,10 @@ class TestBoxShape:
         shape.draw_top_view()
         shape.draw_front_view()
 
-        with tempfile.NamedTemporaryFile(suffix=".dxf", delete=False) as f:
-            shape.save(f.name)
-            # Verify file can be read back
-            doc = ezdxf.readfile(f.name)
-            msp = doc.modelspace()
-            entities = list(msp)
-            assert len(entities) > 0, "DXF should contain entities"
-            os.unlink(f.name)
+        # Verify the DXF can be read back
+        doc = _round_trip(shape)
+        entities = list(doc.modelspace())
+        assert len(entities) > 0, "DXF should contain entities"
 
     def test_has_correct_layers(self):
         params = {"width": 100, "length": 100, "height": 50}
@@ -67,11 +74,8 @@ class TestCylinderShape:
         shape.draw_top_view()
         shape.draw_front_view()
 
-        with tempfile.NamedTemporaryFile(suffix=".dxf", delete=False) as f:
-            shape.save(f.name)
-            doc = ezdxf.readfile(f.name)
-            assert doc is not None
-            os.unlink(f.name)
+        doc = _round_trip(shape)
+        assert len(doc.modelspace()) > 0
 
 
 class TestChairShape:
@@ -93,6 +97,21 @@ class TestChairShape:
         polylines = [e for e in shape.msp if e.dxftype() == "LWPOLYLINE"]
         assert len(polylines) >= 3, "Front view should have backrest + seat + legs"
 
+    def test_batched_polylines_are_bound_to_modelspace(self):
+        params = {"width": 40, "length": 40, "height": 45, "legs": 4}
+        shape = ChairShape(params)
+        shape.draw_front_view()
+        shape.draw_side_view()
+
+        owner = shape.msp.block_record.dxf.handle
+        polylines = [e for e in shape.msp if e.dxftype() == "LWPOLYLINE"]
+        assert len(polylines) == 8
+        for pl in polylines:
+            assert pl.closed
+            assert pl.dxf.owner == owner
+            assert pl.dxf.handle in shape.doc.entitydb
+        assert not shape.doc.audit().has_errors
+
 
 class TestRoomShape:
     """Tests for RoomShape."""
@@ -114,8 +133,18 @@ class TestRoomShape:
         shape = RoomShape(params)
         shape.draw_top_view()
 
-        arcs = [e for e in shape.msp if e.dxftype() == "ARC"]
-        assert len(arcs) >= 1, "Door should produce an arc symbol"
+        # Door swing is a pre-tessellated arc: open polyline besides the walls
+        swings = [
+            e for e in shape.msp
+            if e.dxftype() == "LWPOLYLINE" and not e.closed
+        ]
+        assert len(swings) == 1, "Door should produce a swing arc polyline"
+        points = list(swings[0].get_points(format="xy"))
+        assert len(points) >= 5
+        # All vertices lie on the 80cm swing radius around the hinge
+        hx, hy = 400 / 2 - 80 / 2, 0
+        for x, y in points:
+            assert ((x - hx) ** 2 + (y - hy) ** 2) ** 0.5 == pytest.approx(80)
 
     def test_room_with_window(self):
         params = {
@@ -132,33 +161,39 @@ class TestRoomShape:
 class TestCADFactory:
     """Tests for CADFactory."""
 
-    def test_creates_box(self):
-        obj = CADFactory.create_cad_object({"shape_type": "box"})
-        assert isinstance(obj, BoxShape)
-
-    def test_creates_cylinder(self):
-        obj = CADFactory.create_cad_object({"shape_type": "cylinder"})
-        assert isinstance(obj, CylinderShape)
-
-    def test_creates_chair(self):
-        obj = CADFactory.create_cad_object({"shape_type": "chair"})
-        assert isinstance(obj, ChairShape)
-
-    def test_creates_room(self):
-        obj = CADFactory.create_cad_object({"shape_type": "room"})
-        assert isinstance(obj, RoomShape)
-
-    def test_alias_kursi(self):
-        obj = CADFactory.create_cad_object({"shape_type": "kursi"})
-        assert isinstance(obj, ChairShape)
-
-    def test_alias_ruangan(self):
-        obj = CADFactory.create_cad_object({"shape_type": "ruangan"})
-        assert isinstance(obj, RoomShape)
-
-    def test_unknown_falls_back_to_box(self):
-        obj = CADFactory.create_cad_object({"shape_type": "spaceship"})
-        assert isinstance(obj, BoxShape)
+    @pytest.mark.parametrize("shape_type, expected", [
+        ("box", BoxShape),
+        ("cylinder", CylinderShape),
+        ("chair", ChairShape),
+        ("room", RoomShape),
+        ("kursi", ChairShape),
+        ("ruangan", RoomShape),
+        ("spaceship", BoxShape),  # unknown falls back to box
+    ])
+    def test_creates_shape(self, shape_type, expected):
+        obj = CADFactory.create_cad_object({"shape_type": shape_type})
+        assert isinstance(obj, expected)
+
+    def test_registered_shape_is_dispatched(self):
+        CADFactory.register_shape("Pillar", CylinderShape)
+        try:
+            obj = CADFactory.create_cad_object({"shape_type": " pillar "})
+            assert isinstance(obj, CylinderShape)
+        finally:
+            del CADFactory._registry["pillar"]
+            CADFactory._rebuild_dispatch()
+
+    def test_draw_all_matches_individual_views(self):
+        params = {"shape_type": "chair", "legs": 3}
+        combined = CADFactory.create_cad_object(params)
+        combined.draw_all()
+
+        separate = CADFactory.create_cad_object(params)
+        separate.draw_top_view()
+        separate.draw_front_view()
+        separate.draw_side_view()
+
+        assert [e.dxftype() for e in combined.msp] == [e.dxftype() for e in separate.msp]
 
     def test_available_shapes(self):
         shapes = CADFactory.get_available_shapes()
@@ -177,9 +212,72 @@ class TestSVGExporter:
         shape.draw_top_view()
         shape.draw_front_view()
 
+        svg = shape.render_svg()
+        assert svg.startswith("<svg"), "Should produce valid SVG"
+        assert "viewBox" in svg, "Should have viewBox"
+
+    def test_render_svg_matches_file_conversion(self):
+        params = {"width": 400, "length": 500, "height": 300,
+                  "doors": [{"wall": "east", "width": 90}]}
+        shape = RoomShape(params)
+        shape.draw_top_view()
+        shape.draw_front_view()
+        shape.draw_side_view()
+
         with tempfile.NamedTemporaryFile(suffix=".dxf", delete=False) as f:
             shape.save(f.name)
-            svg = dxf_to_svg(f.name)
-            assert svg.startswith("<svg"), "Should produce valid SVG"
-            assert "viewBox" in svg, "Should have viewBox"
+            assert shape.render_svg() == dxf_to_svg(f.name)
+            os.unlink(f.name)
+
+    def test_open_polyline_stays_open(self):
+        shape = RoomShape({"doors": [{"wall": "south", "width": 80}]})
+        shape.draw_top_view()
+
+        svg = shape.render_svg()
+        assert svg.count("<polyline") == 1, "Door swing must not be closed into a polygon"
+        assert "<polygon" in svg
+
+    def test_text_content_is_escaped(self):
+        shape = BoxShape({"width": 100, "length": 100, "height": 50})
+        shape.add_title("Meja <A&B>", (0, 0))
+
+        svg = shape.render_svg()
+        assert "Meja &lt;A&amp;B&gt;" in svg
+        ElementTree.fromstring(svg)  # must be well-formed XML
+
+    def test_elements_inherit_layer_style_from_group(self):
+        shape = BoxShape({"width": 100, "length": 100, "height": 50})
+        shape.draw_top_view()
+
+        ns = "{http://www.w3.org/2000/svg}"
+        root = ElementTree.fromstring(shape.render_svg())
+        groups = [g for g in root.iter(f"{ns}g") if "stroke" in g.attrib]
+        dim_lines = [
+            line for g in groups if g.get("stroke-width") == "0.5"
+            for line in g.findall(f"{ns}line")
+        ]
+        assert len(dim_lines) == 6, "Both dimension lines (3 segments each) are grouped"
+        assert all("stroke" not in line.attrib for line in dim_lines)
+
+
+class TestExporter3D:
+    """Tests for STL export."""
+
+    def test_room_exports_binary_stl(self):
+        trimesh = pytest.importorskip("trimesh")
+        params = {
+            "shape_type": "room", "width": 400, "length": 500, "height": 300,
+            "doors": [{"wall": "south", "width": 80}],
+            "windows": [{"wall": "east", "width": 120}],
+        }
+
+        with tempfile.NamedTemporaryFile(suffix=".stl", delete=False) as f:
+            assert export_3d_stl(params, f.name)
+            data = open(f.name, "rb").read()
+            mesh = trimesh.load(f.name)
             os.unlink(f.name)
+
+        n_faces = int.from_bytes(data[80:84], "little")
+        assert len(data) == 84 + 50 * n_faces, "Binary STL size must match facet count"
+        assert len(mesh.faces) == n_faces
+        assert mesh.bounds[1][2] == pytest.approx(3.0), "Walls should reach room height"
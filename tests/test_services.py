@@ -0,0 +1,150 @@
+"""Unit tests for AI services — run against a stubbed Groq client."""
+import asyncio
+
+import pytest
+
+pytest.importorskip("groq")
+pytest.importorskip("pydantic")
+
+from app.services import reasoning_service as reasoning_module
+from app.services import vision_service as vision_module
+from app.services.reasoning_service import ReasoningService
+
+VALID_REPLY = '{"shape_type":"box","width":120,"length":60,"height":75,"description":"meja"}'
+INVALID_REPLY = '{"shape_type":"cylinder","diameter":"tiga puluh"}'
+
+
+@pytest.fixture
+def make_service(stub_llm):
+    """ReasoningService whose LLM always streams back the given reply."""
+    def make(reply: str) -> ReasoningService:
+        service = ReasoningService()
+        service.client = stub_llm(reply)
+        return service
+    return make
+
+
+class TestReasoningService:
+    """Tests for prompt -> CAD parameter extraction."""
+
+    def test_null_fields_are_dropped_not_rejected(self, make_service):
+        service = make_service(
+            '{"shape_type":"cylinder","diameter":30,"height":70,'
+            '"width":null,"description":"tiang"}'
+        )
+        params = service.extract_cad_parameters("tiang 30cm")
+        assert params == {"shape_type": "cylinder", "diameter": 30, "height": 70, "description": "tiang"}
+
+    def test_malformed_openings_are_skipped_not_rejected(self, make_service):
+        service = make_service(
+            '{"shape_type":"room","width":400,"length":500,'
+            '"doors":[{"wall":"south","width":90},{"width":"lebar"}],"windows":["north"]}'
+        )
+        params = service.extract_cad_parameters("kamar 4x5 m")
+        assert params == {
+            "shape_type": "room", "width": 400, "length": 500,
+            "doors": [{"wall": "south", "width": 90}], "windows": [],
+        }
+
+    def test_invalid_reply_falls_back_to_box(self, make_service):
+        service = make_service(INVALID_REPLY)
+        params = service.extract_cad_parameters("tiang")
+        assert params["shape_type"] == "box"
+        assert params["description"] == "Default box (LLM fallback)"
+
+    def test_repeated_prompt_is_served_from_cache(self, make_service):
+        service = make_service(VALID_REPLY)
+        first = service.extract_cad_parameters("Meja  120 cm")
+        first["width"] = 0  # callers may mutate their copy
+        second = service.extract_cad_parameters("meja 120 CM")
+
+        assert service.client.chat.completions.calls == 1
+        assert second["width"] == 120
+
+    def test_fallback_is_not_cached(self, make_service):
+        service = make_service(INVALID_REPLY)
+        service.extract_cad_parameters("tiang")
+        service.extract_cad_parameters("tiang")
+        assert service.client.chat.completions.calls == 2
+
+    def test_least_recently_used_prompt_is_evicted(self, make_service, monkeypatch):
+        monkeypatch.setattr(reasoning_module, "_PROMPT_CACHE_SIZE", 2)
+        service = make_service(VALID_REPLY)
+        for prompt in ("a", "b", "a", "c"):
+            service.extract_cad_parameters(prompt)
+        assert service.client.chat.completions.calls == 3
+
+        service.extract_cad_parameters("a")
+        assert service.client.chat.completions.calls == 3, "'a' was used recently"
+        service.extract_cad_parameters("b")
+        assert service.client.chat.completions.calls == 4, "'b' was evicted"
+
+    def test_saved_cache_warms_a_new_service(self, make_service, tmp_path):
+        path = tmp_path / "param_cache.json"
+        warm = make_service(VALID_REPLY)
+        expected = warm.extract_cad_parameters("meja")
+        warm.save_cache(path)
+
+        cold = make_service(INVALID_REPLY)
+        cold.load_cache(path)
+        assert cold.extract_cad_parameters("meja") == expected
+        assert cold.client.chat.completions.calls == 0
+        assert [p.name for p in tmp_path.iterdir()] == ["param_cache.json"]
+
+    @pytest.mark.parametrize("content", [b"{}", b"[[1]]", b'[["k", 1, 2]]', b"[null]", b"[[1, {}]]"])
+    def test_malformed_cache_file_is_ignored(self, make_service, tmp_path, content):
+        path = tmp_path / "param_cache.json"
+        path.write_bytes(content)
+        service = make_service(VALID_REPLY)
+        service.load_cache(path)
+        assert not service._cache
+
+    def test_concurrent_identical_prompts_share_one_call(self, make_service):
+        # A fallback is never cached, so a second call here could only be
+        # avoided by coalescing with the one still in flight
+        service = make_service(INVALID_REPLY)
+
+        async def run():
+            return await asyncio.gather(
+                service.extract_cad_parameters_async("tiang"),
+                service.extract_cad_parameters_async("TIANG"),
+            )
+
+        first, second = asyncio.run(run())
+        assert service.client.chat.completions.calls == 1
+        assert first == second and first is not second
+
+
+class TestVisionService:
+    """Tests for sketch image encoding."""
+
+    def test_resubmitted_image_reuses_data_url(self, monkeypatch):
+        monkeypatch.setattr(vision_module, "_data_url_cache", vision_module.OrderedDict())
+        monkeypatch.setattr(vision_module, "_data_url_cache_bytes", 0)
+        monkeypatch.setattr(vision_module, "_DATA_URL_CACHE_SIZE", 2)
+        images = [bytes([i]) * 30 for i in range(3)]
+
+        first = vision_module._image_data_url(images[0], "image/png")
+        assert first.startswith("data:image/png;base64,")
+        assert vision_module._image_data_url(images[0], "image/png") is first
+        assert vision_module._image_data_url(images[0], "image/jpeg") != first
+
+        for image in images[1:]:
+            vision_module._image_data_url(image, "image/png")
+        assert len(vision_module._data_url_cache) == 2
+
+    def test_data_url_cache_is_bounded_by_size(self, monkeypatch):
+        monkeypatch.setattr(vision_module, "_data_url_cache", vision_module.OrderedDict())
+        monkeypatch.setattr(vision_module, "_data_url_cache_bytes", 0)
+        monkeypatch.setattr(vision_module, "_DATA_URL_CACHE_BYTES", 100)
+        small = [bytes([i]) * 30 for i in range(3)]  # ~63-char URLs each
+
+        for image in small:
+            vision_module._image_data_url(image, "image/png")
+        assert len(vision_module._data_url_cache) == 1
+        assert vision_module._data_url_cache_bytes <= 100
+
+        cached = dict(vision_module._data_url_cache)
+        url = vision_module._image_data_url(b"x" * 300, "image/png")
+        assert url.startswith("data:image/png;base64,")
+        assert vision_module._data_url_cache == cached, "oversized URLs are not cached"